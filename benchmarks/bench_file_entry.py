@@ -0,0 +1,91 @@
+"""
+文件条目内存基准测试 —— 对比列表接口原始 dict 与 FileEntry 保存 N 个条目的内存占用
+
+按 123pan 列表接口的字段构造 N 个条目（经 JSON 解析，与真实响应一样每个字符串独立分配），
+分别以原始 dict 和 FileEntry 保存，用 tracemalloc 统计占用::
+
+    python benchmarks/bench_file_entry.py [条目数]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pan123_core import FileEntry, format_size  # noqa: E402
+
+PAGE_SIZE = 100
+
+
+def _page_json(start: int) -> str:
+    """生成一页 InfoList 的 JSON 文本，字段与列表接口一致。"""
+    items = []
+    for i in range(start, start + PAGE_SIZE):
+        items.append({
+            "FileId": 10_000_000 + i,
+            "FileName": f"IMG_{i:08d}.jpg",
+            "Type": 0,
+            "Size": 3_000_000 + i,
+            "ContentType": "0",
+            "S3KeyFlag": f"1817178140-{i % 7}",
+            "CreateAt": "2024-05-01T12:00:00+08:00",
+            "UpdateAt": "2024-05-01T12:00:00+08:00",
+            "Hidden": False,
+            "Etag": f"{i:032x}",
+            "Status": 2,
+            "ParentFileId": 9_000_000 + i // 1000,
+            "Category": 3,
+            "PunishFlag": 0,
+            "ParentName": "",
+            "DownloadUrl": "",
+            "AbnormalAlert": 1,
+            "Trashed": False,
+            "TrashedExpire": "1970-01-01 08:00:00",
+            "TrashedAt": "",
+            "StorageNode": "m0",
+            "DirectLinkStatus": 0,
+            "AbsPath": f"/{9_000_000 + i // 1000}/{10_000_000 + i}",
+            "Pinyin": "",
+            "BusinessType": 0,
+            "Thumbnail": f"https://thumbnail.123pan.cn/thumb/{i:032x}?w=200",
+            "Operable": False,
+            "StarredStatus": 1,
+            "HighLight": "",
+            "EnableAppeal": 0,
+            "ToolTip": "",
+            "RefuseReason": 0,
+            "DirectTranscodeStatus": 0,
+            "PreviewType": 2,
+            "IsLock": False,
+        })
+    return json.dumps({"InfoList": items})
+
+
+def _measure(name: str, n: int, convert) -> int:
+    """逐页解析并转换 n 个条目，返回保存结果所占的字节数。"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    entries = []
+    for page in range(0, n, PAGE_SIZE):
+        entries.extend(convert(item) for item in json.loads(_page_json(page))["InfoList"])
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<24}{len(entries)} 个条目  {format_size(current):>10}  "
+          f"每条 {current / len(entries):.0f} B  峰值 {format_size(peak)}  {elapsed:.2f} s")
+    del entries
+    return current
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    before = _measure("dict（原始条目）", n, lambda item: item)
+    after = _measure("FileEntry", n, FileEntry.from_dict)
+    print(f"内存降低: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
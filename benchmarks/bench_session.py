@@ -0,0 +1,70 @@
+"""
+连接池基准测试 —— 对比逐次 requests.request 与 Pan123Core 连接池的每秒请求数
+
+在本地启动一个返回 123pan 风格 JSON 的桩服务器，分别用两种方式各发送 N 次请求::
+
+    python benchmarks/bench_session.py [请求次数]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pan123_core import Pan123Core  # noqa: E402
+
+BODY = json.dumps({"code": 0, "message": "ok", "data": {"InfoList": [], "Total": 0}}).encode()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _bench(name: str, fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    elapsed = time.perf_counter() - start
+    rps = n / elapsed
+    print(f"{name:<28}{n} 次请求  {elapsed:.3f} s  {rps:.1f} req/s")
+    return rps
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/file/list/new"
+
+    core = Pan123Core(api_rate_limit=False)
+    before = _bench(
+        "requests.request（无连接池）",
+        lambda: requests.request("GET", url, headers=core.headers, timeout=5).json(),
+        n,
+    )
+    after = _bench("Pan123Core._request（连接池）", lambda: core._request("GET", url), n)
+    print(f"提升: {after / before:.2f}x")
+
+    core.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+"""
+123pan 异步客户端（asyncio + aiohttp）
+
+AsyncPan123Core 以协程形式提供 Pan123Core 的常用操作，单个进程即可同时驱动成千上万个
+列表 / 直链 / 删除请求，而无需为每个在途请求占用一个线程。
+
+登录、配置、请求头、限速器、列表缓存均复用传入的 Pan123Core 实例，接口路径、请求体与
+返回结构（make_result）与同步版本完全一致::
+
+    core = Pan123Core()
+    core.load_config(cfg)
+
+    async def main():
+        async with AsyncPan123Core(core) as client:
+            pages = await asyncio.gather(*(client.list_dir(fid) for fid in folder_ids))
+
+需要可选依赖 aiohttp（pip install -r requirements-async.txt）。
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:  # 可选依赖，未安装时构造 AsyncPan123Core 会报错
+    aiohttp = None
+
+from pan123_core import (
+    API_BASE_URL,
+    CODE_OK,
+    FILE_LIST_PAGE_LIMIT,
+    HTTP_POOL_SIZE,
+    RATE_LIMIT_MAX_RETRIES,
+    S3_MERGE_DELAY,
+    TIMEOUT_DEFAULT,
+    TIMEOUT_FILE_LIST,
+    TIMEOUT_TRASH,
+    TIMEOUT_UPLOAD_CHUNK,
+    TRASH_BATCH_SIZE,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_PRESIGN_BATCH,
+    URL_FILE_LIST,
+    URL_FILE_TRASH,
+    URL_MKDIR,
+    URL_SHARE_CREATE,
+    URL_UPLOAD_COMPLETE,
+    URL_UPLOAD_COMPLETE_S3,
+    URL_UPLOAD_PARTS,
+    URL_UPLOAD_REQUEST,
+    Pan123Core,
+    Pan123EventType,
+    ProgressCallback,
+    calc_file_md5,
+    make_result,
+)
+
+ASYNC_CONCURRENCY = 64
+"""异步客户端同时在途的 API 请求数上限"""
+
+
+class AsyncPan123Core:
+    """Pan123Core 的 asyncio 版本。
+
+    Args:
+        core:               已加载配置（或已登录）的 Pan123Core 实例，提供请求头、限速器与缓存。
+        concurrency:        同时在途的 API 请求数上限。
+        upload_concurrency: 同时上传的分块数上限，默认与 core.upload_concurrency 相同。
+
+    Raises:
+        ImportError: 未安装 aiohttp 时抛出。
+    """
+
+    def __init__(
+            self,
+            core: Pan123Core,
+            concurrency: int = ASYNC_CONCURRENCY,
+            upload_concurrency: Optional[int] = None,
+    ):
+        if aiohttp is None:
+            raise ImportError("AsyncPan123Core 需要 aiohttp，请先执行 pip install aiohttp")
+        self.core = core
+        self.concurrency = concurrency
+        self.upload_concurrency = upload_concurrency or core.upload_concurrency
+        self._api_slots = asyncio.Semaphore(concurrency)
+        self._upload_slots = asyncio.Semaphore(self.upload_concurrency)
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._transfer_session: Optional["aiohttp.ClientSession"] = None
+
+    async def __aenter__(self) -> "AsyncPan123Core":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """关闭底层连接池。"""
+        for session in (self._session, self._transfer_session):
+            if session is not None:
+                await session.close()
+        self._session = self._transfer_session = None
+
+    def _ensure_sessions(self) -> None:
+        # 会话需在事件循环内创建，因此延迟到第一次请求
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=max(HTTP_POOL_SIZE, self.concurrency))
+            self._session = aiohttp.ClientSession(connector=connector)
+            # CDN / S3 请求不携带 API 请求头（与同步版本的 transfer_session 一致）
+            self._transfer_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.concurrency))
+
+    async def _request(
+            self,
+            method: str,
+            path: str,
+            *,
+            json_data: Any = None,
+            params: Any = None,
+            timeout: int = TIMEOUT_DEFAULT,
+    ) -> Dict[str, Any]:
+        """发送 API 请求并返回统一 Result，限速与限频重试规则同 Pan123Core._request()。
+
+        aiohttp 没有 urllib3 那样的传输层重试，GET 超时在这里重试，是唯一的一层。
+        """
+        self._ensure_sessions()
+        url = f"{API_BASE_URL}{path}" if path.startswith("/") else path
+        endpoint = urlparse(url).path
+        limiter = self.core.rate_limiter
+        if params:
+            params = {k: str(v) for k, v in params.items()}
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            can_retry = attempt < RATE_LIMIT_MAX_RETRIES
+            if limiter:
+                wait = limiter.reserve(endpoint)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            try:
+                async with self._api_slots:
+                    async with self._session.request(
+                            method, url,
+                            json=json_data,
+                            params=params,
+                            headers=self.core.headers,
+                            timeout=aiohttp.ClientTimeout(total=timeout),
+                    ) as resp:
+                        try:
+                            data = await resp.json(content_type=None)
+                        except ValueError:
+                            data = None
+                        status, retry_after = resp.status, resp.headers.get("Retry-After", "")
+            except asyncio.TimeoutError as e:
+                # 超时视为限频信号；仅幂等的 GET 自动重试，避免重复提交
+                if limiter:
+                    limiter.on_throttle(endpoint)
+                if limiter and can_retry and method.upper() == "GET":
+                    continue
+                return make_result(-1, f"请求失败: 超时 {e}")
+            except aiohttp.ClientError as e:
+                return make_result(-1, f"请求失败: {e}")
+            result = self.core._handle_response(endpoint, status, retry_after, data, can_retry)
+            if result is not None:
+                return result
+        return make_result(-1, "请求失败")
+
+    # ════════════════════════════════════════════════════════════
+    #  目录浏览
+    # ════════════════════════════════════════════════════════════
+
+    async def list_dir(
+            self,
+            parent_id: Optional[int] = None,
+            page: int = 1,
+            limit: int = FILE_LIST_PAGE_LIMIT,
+            use_cache: bool = True,
+            search: str = "",
+            trashed: bool = False,
+    ) -> Dict[str, Any]:
+        """同 Pan123Core.list_dir()，与同步版本共享 listing_cache 与 path_index。"""
+        if parent_id is None:
+            parent_id = self.core.cwd_id
+        cache_key = (int(parent_id), page, limit, search)
+        if use_cache and not trashed:
+            cached = self.core.listing_cache.get(cache_key)
+            if cached is not None:
+                return make_result(CODE_OK, "ok", {"items": list(cached["items"]), "total": cached["total"]})
+        params = self.core._list_dir_params(parent_id, page, limit, search, trashed)
+        result = await self._request("GET", URL_FILE_LIST, params=params, timeout=TIMEOUT_FILE_LIST)
+        if result["code"] != CODE_OK:
+            return result
+        return self.core._store_listing(cache_key, result["data"]["data"], search, trashed)
+
+    async def iter_dir(
+            self,
+            parent_id: Optional[int] = None,
+            limit: int = FILE_LIST_PAGE_LIMIT,
+            use_cache: bool = True,
+            search: str = "",
+            trashed: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """同 Pan123Core.iter_dir() 的异步生成器版本（async for）。"""
+        if parent_id is None:
+            parent_id = self.core.cwd_id
+        page = 1
+        fetched = 0
+        while True:
+            r = await self.list_dir(parent_id, page=page, limit=limit, use_cache=use_cache, search=search, trashed=trashed)
+            yield r
+            if r["code"] != CODE_OK:
+                return
+            items = r["data"]["items"]
+            fetched += len(items)
+            if not items or fetched >= r["data"]["total"]:
+                return
+            page += 1
+
+    async def list_dir_all(
+            self,
+            parent_id: Optional[int] = None,
+            limit: int = FILE_LIST_PAGE_LIMIT,
+            trashed: bool = False,
+    ) -> Dict[str, Any]:
+        """同 Pan123Core.list_dir_all()：第一页得到 Total 后并发获取其余各页，按页序拼接并按 FileId 去重，
+        结果与 Total 不符时忽略缓存逐页顺序重新获取。"""
+        if parent_id is None:
+            parent_id = self.core.cwd_id
+        first = await self.list_dir(parent_id, page=1, limit=limit, trashed=trashed)
+        if first["code"] != CODE_OK:
+            return first
+        pages = [first]
+        page_size = len(first["data"]["items"]) or limit
+        page_count = -(-first["data"]["total"] // page_size)
+        if page_count > 1:
+            pages += await asyncio.gather(*(
+                self.list_dir(parent_id, page=page, limit=limit, trashed=trashed) for page in range(2, page_count + 1)
+            ))
+        for r in pages:
+            if r["code"] != CODE_OK:
+                return r
+        items, complete = self.core._merge_pages([r["data"] for r in pages])
+        if not complete:
+            # 并发翻页期间目录发生变化，可能漏掉条目，退回逐页顺序获取
+            sequential = []
+            async for r in self.iter_dir(parent_id, limit, use_cache=False, trashed=trashed):
+                if r["code"] != CODE_OK:
+                    return r
+                sequential.append(r["data"])
+            pages = [make_result(CODE_OK, "ok", data) for data in sequential]
+            items, _ = self.core._merge_pages(sequential)
+        return make_result(CODE_OK, "ok", {"items": items, "total": pages[-1]["data"]["total"]})
+
+    async def search(
+            self,
+            query: str,
+            parent_id: Optional[int] = None,
+            limit: int = FILE_LIST_PAGE_LIMIT,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """同 Pan123Core.search() 的异步生成器版本。"""
+        if not query:
+            yield make_result(-1, "搜索关键字不能为空")
+            return
+        async for r in self.iter_dir(0 if parent_id is None else parent_id, limit=limit, search=query):
+            yield r
+
+    async def mkdir(self, name: str, parent_id: Optional[int] = None) -> Dict[str, Any]:
+        """同 Pan123Core.mkdir()。"""
+        if not name:
+            return make_result(-1, "目录名不能为空")
+        if parent_id is None:
+            parent_id = self.core.cwd_id
+        r = await self._request("POST", URL_MKDIR, json_data=self.core._mkdir_payload(name, parent_id))
+        self.core._invalidate_dir(parent_id)
+        return r
+
+    async def trash(self, file_data: Any, delete: bool = True) -> Dict[str, Any]:
+        """同 Pan123Core.trash()。"""
+        payload = self.core._trash_payload(file_data, delete)
+        r = await self._request("POST", URL_FILE_TRASH, json_data=payload, timeout=TIMEOUT_TRASH)
+        return self.core._trash_result(r, file_data, delete)
+
+    async def restore(self, file_id: int) -> Dict[str, Any]:
+        """同 Pan123Core.restore()。"""
+        return await self.trash({"FileId": file_id}, delete=False)
+
+    async def trash_many(
+            self,
+            items: List[Any],
+            delete: bool = True,
+            batch_size: int = TRASH_BATCH_SIZE,
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """同 Pan123Core.trash_many()，所有批次同时提交（受 concurrency 限制）。"""
+        batches = self.core._trash_batches(items, batch_size)
+        stats: Dict[str, Any] = {"done": 0, "failed": [], "errors": []}
+
+        async def submit(batch: List[Dict]) -> None:
+            r = await self.trash(batch, delete)
+            self.core._trash_many_progress(stats, batch, r, len(items), on_progress)
+
+        await asyncio.gather(*(submit(batch) for batch in batches))
+        return self.core._trash_many_result(stats, delete)
+
+    async def restore_many(
+            self,
+            items: List[Any],
+            batch_size: int = TRASH_BATCH_SIZE,
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """同 Pan123Core.restore_many()。"""
+        return await self.trash_many(items, delete=False, batch_size=batch_size, on_progress=on_progress)
+
+    # ════════════════════════════════════════════════════════════
+    #  分享与下载
+    # ════════════════════════════════════════════════════════════
+
+    async def share(
+            self,
+            file_ids: List[int],
+            share_pwd: str = "",
+            expiration: str = "2099-12-12T08:00:00+08:00",
+    ) -> Dict[str, Any]:
+        """同 Pan123Core.share()。"""
+        if not file_ids:
+            return make_result(-1, "未选择文件")
+        payload = self.core._share_payload(file_ids, share_pwd, expiration)
+        r = await self._request("POST", URL_SHARE_CREATE, json_data=payload)
+        if r["code"] != CODE_OK:
+            return r
+        return self.core._share_result(r["data"], share_pwd)
+
+    async def get_item_download_url(self, item: Dict, use_cache: bool = True) -> Dict[str, Any]:
+        """同 Pan123Core.get_item_download_url()，与同步版本共享 link_cache。"""
+        link_cache = self.core.link_cache
+        if item["Type"] != 1 and use_cache:
+            url = link_cache.get(item)
+            if url:
+                return make_result(CODE_OK, "ok", {"url": url})
+        r = await self._resolve_download_url(item)
+        if r["code"] == CODE_OK and item["Type"] != 1:
+            link_cache.put(item, r["data"]["url"])
+        return r
+
+    async def _resolve_download_url(self, item: Dict) -> Dict[str, Any]:
+        api_path, payload = self.core._download_info_request(item)
+        r = await self._request("POST", api_path, json_data=payload)
+        if r["code"] != CODE_OK:
+            return r
+        download_url = (r["data"].get("data") or {}).get("DownloadUrl")
+        if not download_url:
+            return make_result(-1, "获取下载地址失败: 响应中缺少 DownloadUrl", r["data"])
+        try:
+            async with self._api_slots:
+                # 下载地址的证书与域名不匹配，与同步版本一样仅在此处关闭证书校验
+                async with self._transfer_session.get(
+                        download_url,
+                        allow_redirects=False,
+                        ssl=False,
+                        timeout=aiohttp.ClientTimeout(total=TIMEOUT_DEFAULT),
+                ) as resp:
+                    text = await resp.text(errors="replace")
+                    return self.core._parse_download_redirect(resp.status, resp.headers.get("Location"), text)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return make_result(-1, f"获取真实下载链接失败: {e}")
+
+    # ════════════════════════════════════════════════════════════
+    #  上传
+    # ════════════════════════════════════════════════════════════
+
+    async def upload_file(
+            self,
+            file_path: str,
+            duplicate: int = 0,
+            on_progress: ProgressCallback = None,
+            parent_id: Optional[int] = None,
+            md5: str = "",
+    ) -> Dict[str, Any]:
+        """同 Pan123Core.upload_file()：秒传或并发分块上传。
+
+        MD5 计算与分块读取在默认线程池中执行，不阻塞事件循环；不使用 upload_journal 续传。
+        """
+        file_path = file_path.strip().replace('"', "").replace("\\", "/")
+        if not os.path.exists(file_path):
+            return make_result(-1, "文件不存在")
+        if os.path.isdir(file_path):
+            return make_result(-1, "暂不支持文件夹上传")
+        if parent_id is None:
+            parent_id = self.core.cwd_id
+        loop = asyncio.get_running_loop()
+        try:
+            file_size = os.path.getsize(file_path)
+            if not md5:
+                hash_cache = self.core.hash_cache
+                md5 = await loop.run_in_executor(
+                    None, hash_cache.file_md5 if hash_cache else calc_file_md5, file_path,
+                )
+        except IOError as e:
+            return make_result(-1, f"读取文件失败: {e}")
+
+        payload = self.core._upload_request_payload(md5, os.path.basename(file_path), parent_id, file_size, duplicate)
+        r = await self._request("POST", URL_UPLOAD_REQUEST, json_data=payload)
+        if r["code"] != CODE_OK:
+            return self.core._upload_request_error(r)
+        self.core._invalidate_dir(parent_id)
+        resp_data = r["data"]["data"]
+        if resp_data.get("Reuse", False):
+            return make_result(CODE_OK, "秒传成功（MD5 复用）", {"reuse": True})
+
+        session = {
+            "bucket": resp_data["Bucket"],
+            "key": resp_data["Key"],
+            "uploadId": resp_data["UploadId"],
+            "StorageNode": resp_data["StorageNode"],
+        }
+        r = await self._upload_chunks(file_path, file_size, session, on_progress)
+        if r["code"] != CODE_OK:
+            return r
+
+        await self._request("POST", URL_UPLOAD_COMPLETE_S3, json_data=session, timeout=TIMEOUT_TRASH)
+        await asyncio.sleep(S3_MERGE_DELAY)
+        r = await self._request("POST", URL_UPLOAD_COMPLETE, json_data={"fileId": resp_data["FileId"]})
+        if r["code"] == CODE_OK:
+            return make_result(CODE_OK, "上传完成", {"reuse": False})
+        return make_result(-1, f"上传确认失败: {r['message']}")
+
+    async def _upload_chunks(
+            self,
+            file_path: str,
+            total_size: int,
+            session: Dict[str, Any],
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """并发上传全部分块，调度同 Pan123Core._upload_chunks()。
+
+        最多 upload_concurrency 个分块同时在途，预签名 URL 用完时再获取下一批，批次之间不停顿；
+        进度只统计从第 1 块起连续完成的分块。
+        """
+        part_count = -(-total_size // UPLOAD_CHUNK_SIZE)
+        urls: Dict[int, str] = {}
+        finished: Dict[int, int] = {}
+        in_flight: Dict[asyncio.Task, int] = {}
+        next_part = 1
+        contiguous = 1
+        uploaded = 0
+        error: Optional[Dict[str, Any]] = None
+
+        try:
+            while (next_part <= part_count or in_flight) and error is None:
+                # 补足在途分块，URL 用完时批量获取下一批
+                while next_part <= part_count and len(in_flight) < self.upload_concurrency:
+                    if next_part not in urls:
+                        batch_end = min(next_part + UPLOAD_PRESIGN_BATCH, part_count + 1)
+                        r = await self._request("POST", URL_UPLOAD_PARTS, json_data={
+                            **session, "partNumberStart": next_part, "partNumberEnd": batch_end,
+                        })
+                        r = self.core._presign_result(r, next_part, batch_end)
+                        if r["code"] != CODE_OK:
+                            error = make_result(min(r["code"], -1), f"获取上传 URL 失败: {r['message']}")
+                            break
+                        urls.update(r["data"])
+                    task = asyncio.ensure_future(self._upload_part(file_path, next_part, urls.pop(next_part)))
+                    in_flight[task] = next_part
+                    next_part += 1
+                if in_flight:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        part_number = in_flight.pop(task)
+                        r = task.result()
+                        if r["code"] != CODE_OK:
+                            error = error or r
+                            continue
+                        finished[part_number] = r["data"]["size"]
+                # 按分块顺序累计进度
+                while contiguous in finished:
+                    uploaded += finished.pop(contiguous)
+                    contiguous += 1
+                    if on_progress:
+                        on_progress({
+                            "type": Pan123EventType.UPLOAD_PROGRESS,
+                            "uploaded": uploaded,
+                            "total": total_size,
+                            "percent": uploaded / total_size * 100,
+                        })
+        except BaseException:
+            for task in in_flight:
+                task.cancel()
+            raise
+        finally:
+            # 与同步版本一样等待在途分块结束，保证复用缓冲区全部归还
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+        if error is not None:
+            return error
+        return make_result(CODE_OK, "ok")
+
+    async def _upload_part(self, file_path: str, part_number: int, upload_url: str) -> Dict[str, Any]:
+        """读取第 part_number 块并 PUT 到预签名 URL，受 upload_concurrency 限制。
+
+        与同步版本共享 core._part_buffers，分块读入复用缓冲区并以 memoryview 发送。
+        """
+        buffers = self.core._part_buffers
+        async with self._upload_slots:
+            try:
+                buf, chunk = await asyncio.get_running_loop().run_in_executor(
+                    None, buffers.read_part, file_path, part_number,
+                )
+            except IOError as e:
+                return make_result(-1, f"读取文件失败: {e}")
+            size = len(chunk)
+            try:
+                async with self._transfer_session.put(
+                        upload_url,
+                        data=chunk,
+                        timeout=aiohttp.ClientTimeout(total=TIMEOUT_UPLOAD_CHUNK),
+                ) as resp:
+                    if resp.status not in (200, 201):
+                        return make_result(-1, f"分块 {part_number} 上传失败，HTTP {resp.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                return make_result(-1, f"分块 {part_number} 上传请求失败: {e}")
+            finally:
+                buffers.release(buf)
+        return make_result(CODE_OK, "ok", {"part": part_number, "size": size})
@@ -0,0 +1,472 @@
+"""
+123pan 远程文件树本地目录库（SQLite）
+
+将 list_dir() 返回的 InfoList 记录持久化到本地数据库，之后可离线完成路径解析、
+目录大小统计和重复文件检测，而无需重新遍历网盘。
+
+公开方法与 pan123_core 一致，统一返回 Result 字典。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pan123_core import (
+    CODE_OK,
+    FILE_LIST_PAGE_LIMIT,
+    Pan123Core,
+    Pan123EventType,
+    ProgressCallback,
+    make_result,
+)
+
+CATALOG_FILE = "123pan_catalog.db"
+"""目录库默认数据库文件"""
+
+CATALOG_FIELDS = ("FileId", "ParentFileId", "FileName", "Type", "Size", "Etag", "S3KeyFlag", "UpdateAt")
+"""目录库保存的 InfoList 字段"""
+
+CHANGE_ADD = "add"
+CHANGE_MODIFY = "modify"
+CHANGE_DELETE = "delete"
+
+
+class Pan123Catalog:
+    """远程文件树的本地 SQLite 目录库。
+
+    通过 crawl() 全量遍历网盘写入数据库，之后 resolve_path() / folder_size() / duplicates()
+    等查询均在本地完成。可在多线程中共享同一实例。
+
+    Args:
+        core: 已登录的 Pan123Core 实例，仅 crawl() 需要访问网络。
+        path: 数据库文件路径。
+    """
+
+    def __init__(self, core: Pan123Core, path: str = CATALOG_FILE):
+        self.core = core
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " FileId INTEGER PRIMARY KEY, ParentFileId INTEGER NOT NULL, FileName TEXT NOT NULL,"
+            " Type INTEGER NOT NULL, Size INTEGER NOT NULL DEFAULT 0, Etag TEXT NOT NULL DEFAULT '',"
+            " S3KeyFlag TEXT NOT NULL DEFAULT '', UpdateAt TEXT NOT NULL DEFAULT '');"
+            "CREATE INDEX IF NOT EXISTS idx_files_parent ON files (ParentFileId, FileName);"
+            "CREATE INDEX IF NOT EXISTS idx_files_name ON files (FileName);"
+            "CREATE INDEX IF NOT EXISTS idx_files_etag ON files (Etag);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS folders (FolderId INTEGER PRIMARY KEY, Details TEXT NOT NULL, SyncedAt INTEGER);"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ════════════════════════════════════════════════════════════
+    #  写入
+    # ════════════════════════════════════════════════════════════
+
+    def store(self, items: Iterable[Dict[str, Any]], parent_id: Optional[int] = None) -> int:
+        """写入（或更新）一批 InfoList 记录。
+
+        Args:
+            items:     list_dir() 返回的条目。
+            parent_id: 条目缺少 ParentFileId 字段时使用的父目录 FileId。
+
+        Returns:
+            写入的条目数。
+        """
+        rows = [self._row(item, parent_id) for item in items]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO files ({', '.join(CATALOG_FIELDS)}) VALUES ({', '.join('?' * len(CATALOG_FIELDS))})",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def crawl(
+            self,
+            root_id: int = 0,
+            on_progress: ProgressCallback = None,
+            use_details: bool = True,
+    ) -> Dict[str, Any]:
+        """从 root_id 开始广度优先遍历网盘，重建该子树在目录库中的记录。
+
+        每完成一个文件夹写入一次数据库，中途失败时已遍历的部分仍保留在库中。
+        use_details=True 时在列出每个文件夹前获取其 get_folder_details() 快照，整棵子树遍历完成后
+        统一写入，之后的 sync() 可据此直接跳过未变化的子树；中途失败时不写入任何快照。
+
+        Args:
+            root_id:     遍历起点 FileId，0 为根目录（此时清空整个目录库）。
+            on_progress: 进度回调，每遍历完一个文件夹触发一次 CATALOG_PROGRESS 事件::
+
+                             {"type": "catalog_progress", "folders": int, "files": int, "pending": int}
+
+            use_details: 是否保存文件夹详情快照（每个文件夹多一次请求）。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": {"folders": int, "files": int, "elapsed": float}}
+                失败: 出错的 list_dir() Result，data 中附带已遍历的统计
+        """
+        start = time.monotonic()
+        self._delete_subtree(root_id)
+        folders = files = 0
+        snapshots: List[Tuple[int, str]] = []
+        pending = deque([root_id])
+        while pending:
+            folder_id = pending.popleft()
+            # 快照先于列表获取，期间发生的变化会让下次 sync() 重新列出该子树
+            details = self._fetch_snapshot(folder_id) if use_details else None
+            items: List[Dict[str, Any]] = []
+            for page in self.core.iter_dir(folder_id, limit=FILE_LIST_PAGE_LIMIT, use_cache=False):
+                if page["code"] != CODE_OK:
+                    page["data"] = {"folders": folders, "files": files, "failed_folder": folder_id}
+                    return page
+                items.extend(page["data"]["items"])
+            self.store(items, folder_id)
+            if details is not None:
+                snapshots.append((folder_id, details))
+            folders += 1
+            for item in items:
+                if item["Type"] == 1:
+                    pending.append(item["FileId"])
+                else:
+                    files += 1
+            if on_progress:
+                on_progress({
+                    "type": Pan123EventType.CATALOG_PROGRESS,
+                    "folders": folders,
+                    "files": files,
+                    "pending": len(pending),
+                })
+        # 快照在整棵子树列出后才写入：中途失败时祖先文件夹没有新快照，下次 sync() 会重新列出它们
+        self._save_snapshots(snapshots)
+        if root_id == 0:
+            self._set_meta("crawled_at", str(int(time.time())))
+        return make_result(CODE_OK, "ok", {
+            "folders": folders,
+            "files": files,
+            "elapsed": time.monotonic() - start,
+        })
+
+    def sync(
+            self,
+            root_id: int = 0,
+            use_details: bool = True,
+            on_change: Optional[Callable[[Dict[str, Any]], None]] = None,
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """增量同步：只重新列出发生变化的文件夹，并输出新增 / 修改 / 删除事件流。
+
+        root_id 总是重新列出。对其中已在目录库中的子文件夹，比较其 UpdateAt 与上次记录是否一致；
+        use_details=True 时还会调用 get_folder_details() 与上次保存的快照比较（详情按整棵子树统计，
+        能发现深层变化）。两者都未变化的子文件夹连同其整棵子树被跳过，其余文件夹继续向下同步。
+        新出现的文件夹整棵子树都会被列出，use_details=True 时同时保存其中每个文件夹的快照。
+        快照在同步完成后才写入，中途失败时本次列出的文件夹下次仍会重新列出。
+        目录库为空时等价于一次全量遍历。
+
+        Args:
+            root_id:     同步起点 FileId，0 为根目录。
+            use_details: 是否使用 get_folder_details() 快照判断子树是否变化（False 时只比较 UpdateAt）。
+            on_change:   变化回调，每个变化触发一次 CATALOG_CHANGE 事件::
+
+                             {"type": "catalog_change", "change": "add" | "modify" | "delete",
+                              "item": {条目 dict}, "path": "/a/b/c.txt"}
+
+            on_progress: 进度回调，每列出一个文件夹触发一次 CATALOG_PROGRESS 事件::
+
+                             {"type": "catalog_progress", "folders": int, "skipped": int, "pending": int}
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": {"added": int, "modified": int, "deleted": int,
+                       "folders": int, "skipped": int, "elapsed": float}}
+                失败: 出错的 list_dir() Result，data 中附带已同步的统计；已同步的部分仍写入目录库
+        """
+        start = time.monotonic()
+        stats = {CHANGE_ADD: 0, CHANGE_MODIFY: 0, CHANGE_DELETE: 0}
+        listed = skipped = 0
+        snapshots: List[Tuple[int, str]] = []
+
+        def emit(change: str, item: Dict[str, Any], path: str = "") -> None:
+            stats[change] += 1
+            if on_change:
+                on_change({
+                    "type": Pan123EventType.CATALOG_CHANGE,
+                    "change": change,
+                    "item": item,
+                    "path": path or self.path_of(item["FileId"]),
+                })
+
+        # (文件夹 FileId, 是否整棵子树都需列出, 列出成功后保存的详情快照)
+        pending = deque([(root_id, False, None)])
+        while pending:
+            folder_id, full, details = pending.popleft()
+            if full and use_details:
+                details = self._fetch_snapshot(folder_id)
+            items: List[Dict[str, Any]] = []
+            for page in self.core.iter_dir(folder_id, limit=FILE_LIST_PAGE_LIMIT, use_cache=False):
+                if page["code"] != CODE_OK:
+                    page["data"] = {
+                        "added": stats[CHANGE_ADD], "modified": stats[CHANGE_MODIFY], "deleted": stats[CHANGE_DELETE],
+                        "folders": listed, "skipped": skipped, "failed_folder": folder_id,
+                    }
+                    return page
+                items.extend(page["data"]["items"])
+            listed += 1
+
+            old = {row["FileId"]: row for row in self.children(folder_id)}
+            new_ids = {int(item["FileId"]) for item in items}
+            for file_id, row in old.items():
+                if file_id not in new_ids:
+                    for gone in self._remove_subtree(row):
+                        emit(CHANGE_DELETE, gone["item"], gone["path"])
+            self.store(items, folder_id)
+            if details is not None:
+                snapshots.append((folder_id, details))
+
+            for item in items:
+                file_id = int(item["FileId"])
+                previous = old.get(file_id)
+                if previous is None:
+                    emit(CHANGE_ADD, self.get(file_id))
+                elif self._row(previous, folder_id) != self._row(item, folder_id):
+                    emit(CHANGE_MODIFY, self.get(file_id))
+                if item["Type"] != 1:
+                    continue
+                if full or previous is None:
+                    pending.append((file_id, True, None))
+                    continue
+                snapshot = None
+                changed = str(previous["UpdateAt"]) != str(item.get("UpdateAt") or "")
+                if use_details:
+                    snapshot = self._fetch_snapshot(file_id)
+                    changed = changed or snapshot is None or snapshot != self._load_snapshot(file_id)
+                if changed:
+                    pending.append((file_id, False, snapshot))
+                else:
+                    skipped += 1
+
+            if on_progress:
+                on_progress({
+                    "type": Pan123EventType.CATALOG_PROGRESS,
+                    "folders": listed,
+                    "skipped": skipped,
+                    "pending": len(pending),
+                })
+        # 快照在整棵子树列出后才写入：中途失败时祖先文件夹没有新快照，下次 sync() 会重新列出它们
+        self._save_snapshots(snapshots)
+        if root_id == 0:
+            self._set_meta("crawled_at", str(int(time.time())))
+        return make_result(CODE_OK, "ok", {
+            "added": stats[CHANGE_ADD],
+            "modified": stats[CHANGE_MODIFY],
+            "deleted": stats[CHANGE_DELETE],
+            "folders": listed,
+            "skipped": skipped,
+            "elapsed": time.monotonic() - start,
+        })
+
+    def _delete_subtree(self, root_id: int) -> None:
+        with self._lock:
+            if root_id == 0:
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute("DELETE FROM folders")
+            else:
+                subtree = (
+                    "WITH RECURSIVE sub(id) AS ("
+                    " SELECT FileId FROM files WHERE ParentFileId = ?"
+                    " UNION ALL SELECT f.FileId FROM files f JOIN sub ON f.ParentFileId = sub.id)"
+                )
+                # 先删快照（依赖 files 中的层级关系），root_id 自身的快照也随子树失效
+                self._conn.execute(
+                    f"{subtree} DELETE FROM folders WHERE FolderId = ? OR FolderId IN sub",
+                    (root_id, root_id),
+                )
+                self._conn.execute(f"{subtree} DELETE FROM files WHERE FileId IN sub", (root_id,))
+            self._conn.commit()
+
+    def _remove_subtree(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从目录库删除条目及其全部子孙，返回被删除的 {"item", "path"} 列表（子孙在前）。"""
+        removed = []
+        base = self.path_of(item["FileId"])
+        stack = [(item, base)]
+        while stack:
+            current, path = stack.pop()
+            removed.append({"item": current, "path": path})
+            if current["Type"] == 1:
+                stack.extend((child, f"{path}/{child['FileName']}") for child in self.children(current["FileId"]))
+        removed.reverse()
+        with self._lock:
+            ids = [(entry["item"]["FileId"],) for entry in removed]
+            self._conn.executemany("DELETE FROM files WHERE FileId = ?", ids)
+            self._conn.executemany("DELETE FROM folders WHERE FolderId = ?", ids)
+            self._conn.commit()
+        return removed
+
+    def _fetch_snapshot(self, folder_id: int) -> Optional[str]:
+        """获取文件夹详情并序列化为快照，根目录或请求失败时返回 None。"""
+        if folder_id == 0:
+            return None
+        r = self.core.get_folder_details(folder_id)
+        if r["code"] != CODE_OK:
+            return None
+        return json.dumps(r["data"], sort_keys=True, ensure_ascii=False)
+
+    def _load_snapshot(self, folder_id: int) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT Details FROM folders WHERE FolderId = ?", (folder_id,)).fetchone()
+        return row[0] if row else None
+
+    def _save_snapshots(self, snapshots: List[Tuple[int, str]]) -> None:
+        now = int(time.time())
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO folders (FolderId, Details, SyncedAt) VALUES (?, ?, ?)",
+                [(folder_id, details, now) for folder_id, details in snapshots],
+            )
+            self._conn.commit()
+
+    def _set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    @staticmethod
+    def _row(item: Dict[str, Any], parent_id: Optional[int]) -> tuple:
+        return (
+            int(item["FileId"]),
+            int(item.get("ParentFileId", parent_id if parent_id is not None else 0)),
+            item["FileName"],
+            int(item["Type"]),
+            int(item.get("Size") or 0),
+            item.get("Etag") or "",
+            item.get("S3KeyFlag") or "",
+            str(item.get("UpdateAt") or ""),
+        )
+
+    # ════════════════════════════════════════════════════════════
+    #  查询
+    # ════════════════════════════════════════════════════════════
+
+    def get(self, file_id: int) -> Optional[Dict[str, Any]]:
+        """按 FileId 查询条目，不存在返回 None。"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE FileId = ?", (file_id,)).fetchone()
+        return dict(row) if row else None
+
+    def children(self, parent_id: int) -> List[Dict[str, Any]]:
+        """返回指定文件夹的直接子条目（文件夹在前，按名称排序）。"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM files WHERE ParentFileId = ? ORDER BY Type DESC, FileName",
+                (parent_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def resolve_path(self, path: str) -> Dict[str, Any]:
+        """将 "/a/b/c" 形式的路径解析为条目。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": {条目 dict}}，根目录返回 {"FileId": 0, "Type": 1, ...}
+                失败: {"code": -1, "message": "路径不存在: ...", "data": None}
+        """
+        item: Dict[str, Any] = {"FileId": 0, "ParentFileId": 0, "FileName": "", "Type": 1, "Size": 0}
+        with self._lock:
+            for name in [p for p in path.replace("\\", "/").split("/") if p]:
+                row = self._conn.execute(
+                    "SELECT * FROM files WHERE ParentFileId = ? AND FileName = ?",
+                    (item["FileId"], name),
+                ).fetchone()
+                if row is None:
+                    return make_result(-1, f"路径不存在: {path}")
+                item = dict(row)
+        return make_result(CODE_OK, "ok", item)
+
+    def path_of(self, file_id: int) -> str:
+        """返回条目的完整路径（如 "/a/b/c.txt"），目录库中缺少祖先时以 "?" 表示缺失部分。"""
+        names: List[str] = []
+        with self._lock:
+            while file_id:
+                row = self._conn.execute(
+                    "SELECT ParentFileId, FileName FROM files WHERE FileId = ?", (file_id,)
+                ).fetchone()
+                if row is None:
+                    names.append("?")
+                    break
+                names.append(row["FileName"])
+                file_id = row["ParentFileId"]
+        return "/" + "/".join(reversed(names))
+
+    def folder_size(self, folder_id: int) -> Dict[str, Any]:
+        """递归统计文件夹大小。
+
+        Returns:
+            Result 字典，data 为 {"files": int, "folders": int, "size": int}。
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "WITH RECURSIVE sub(id) AS ("
+                " SELECT ? UNION ALL"
+                " SELECT f.FileId FROM files f JOIN sub ON f.ParentFileId = sub.id WHERE f.Type = 1)"
+                " SELECT SUM(Type = 0), SUM(Type = 1), SUM(CASE WHEN Type = 0 THEN Size ELSE 0 END)"
+                " FROM files WHERE ParentFileId IN sub",
+                (folder_id,),
+            ).fetchone()
+        return make_result(CODE_OK, "ok", {"files": row[0] or 0, "folders": row[1] or 0, "size": row[2] or 0})
+
+    def duplicates(self, min_size: int = 1, limit: int = 0) -> Dict[str, Any]:
+        """按 Etag（MD5）查找重复文件，按可节省的空间从大到小排序。
+
+        Args:
+            min_size: 只统计不小于该大小（字节）的文件。
+            limit:    最多返回的分组数，0 表示不限制。
+
+        Returns:
+            Result 字典，data 为分组列表::
+
+                [{"etag": str, "size": int, "wasted": int, "items": [条目 dict, ...]}, ...]
+        """
+        sql = (
+            "SELECT Etag, MAX(Size) AS size, COUNT(*) AS n FROM files"
+            " WHERE Type = 0 AND Etag != '' AND Size >= ?"
+            " GROUP BY Etag HAVING n > 1 ORDER BY size * (n - 1) DESC"
+        )
+        params: List[Any] = [min_size]
+        if limit > 0:
+            sql += " LIMIT ?"
+            params.append(limit)
+        groups = []
+        with self._lock:
+            for etag, size, n in self._conn.execute(sql, params).fetchall():
+                rows = self._conn.execute("SELECT * FROM files WHERE Etag = ? AND Type = 0", (etag,)).fetchall()
+                groups.append({"etag": etag, "size": size, "wasted": size * (n - 1), "items": [dict(r) for r in rows]})
+        return make_result(CODE_OK, "ok", groups)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回目录库概况：条目数、文件总大小、上次完整遍历时间（时间戳，未遍历为 0）。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT SUM(Type = 0), SUM(Type = 1), SUM(CASE WHEN Type = 0 THEN Size ELSE 0 END) FROM files"
+            ).fetchone()
+            crawled = self._conn.execute("SELECT value FROM meta WHERE key = 'crawled_at'").fetchone()
+        return make_result(CODE_OK, "ok", {
+            "files": row[0] or 0,
+            "folders": row[1] or 0,
+            "size": row[2] or 0,
+            "crawled_at": int(crawled[0]) if crawled else 0,
+        })
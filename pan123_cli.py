@@ -3,11 +3,22 @@
 """
 
 import json
+import multiprocessing
 import os
 import sys
-from typing import Dict
+import time
+from typing import Dict, List, Optional
 
-from pan123_core import Pan123Core, Pan123Tool, Pan123EventType, format_size
+from pan123_catalog import CATALOG_FILE, Pan123Catalog
+from pan123_core import (
+    HASH_CACHE_FILE,
+    SYNC_DIRECTIONS,
+    UPLOAD_JOURNAL_FILE,
+    Pan123Core,
+    Pan123EventType,
+    Pan123Tool,
+    format_size,
+)
 
 
 # ──────────────── 颜色工具 ────────────────
@@ -33,14 +44,19 @@ class Pan123CLI:
 
     HELP_TEXT = """可用命令:
   ls                 - 显示当前目录
-  cd [编号|..|/]     - 切换目录
+  cd [编号|..|/|路径] - 切换目录（路径如 /照片/2024 或 ../文档）
   mkdir [名称]       - 创建目录
-  upload [路径]      - 上传文件
-  rm [编号]          - 删除文件
+  upload [路径]      - 上传文件或文件夹
+  uploads [purge|clear] - 查看 / 清理未完成的上传会话
+  sync [本地目录] [up|down|both] - 比较当前目录与本地文件夹，确认后上传 / 下载有差异的文件
+  rm [编号 ...]      - 删除文件（可指定多个编号或范围，如 rm 1 3 5-8）
   share [编号 ...]   - 创建分享
-  link [编号]        - 获取文件直链
+  link [编号 ...]    - 获取文件直链（可一次指定多个）
   download/d [编号]  - 下载文件
-  recycle            - 管理回收站
+  export [编号] [aria2|curl] [输出文件] - 导出文件 / 文件夹的直链清单，交给 aria2c / curl 下载
+  recycle            - 管理回收站（按编号 / 范围恢复，或按通配符与天数批量恢复 / 清理）
+  find [关键字]      - 按文件名搜索整个网盘
+  catalog [crawl|sync|du [路径]|dup] - 本地目录库：遍历网盘 / 增量同步 / 统计目录大小 / 查找重复文件
   refresh/re         - 刷新目录
   reload             - 重新加载配置并刷新
   login              - 登录
@@ -50,11 +66,16 @@ class Pan123CLI:
   protocol [android|web] - 切换协议
   exit               - 退出程序"""
 
+    FIND_MAX_RESULTS = 200
+    SYNC_PREVIEW_LINES = 50
+    RECYCLE_SHOW_MAX = 200
+
     def __init__(self, config_file: str = "123pan_config.json"):
         self.config_file: str = config_file
-        self.core = Pan123Core()
+        self.core = Pan123Core(upload_journal_file=UPLOAD_JOURNAL_FILE, hash_cache_file=HASH_CACHE_FILE)
         self.tool = Pan123Tool(self.core)
         self._download_mode: int = 0  # 0=询问, 3=全部覆盖, 4=全部跳过
+        self._catalog: Optional[Pan123Catalog] = None
 
     # ──────────────── 启动 ────────────────
 
@@ -160,15 +181,20 @@ class Pan123CLI:
             "cd": lambda: self._do_cd(arg),
             "mkdir": lambda: self._do_mkdir(arg),
             "upload": lambda: self._do_upload(arg),
+            "uploads": lambda: self._do_uploads(arg),
+            "sync": lambda: self._do_sync(arg),
             "rm": lambda: self._do_rm(arg),
             "share": lambda: self._do_share(arg),
             "more": lambda: self._do_more(),
             "link": lambda: self._do_link(arg),
             "download": lambda: self._do_download(arg),
             "d": lambda: self._do_download(arg),
+            "export": lambda: self._do_export(arg),
             "recycle": lambda: self._do_recycle(),
-            "refresh": lambda: self._do_refresh(),
-            "re": lambda: self._do_refresh(),
+            "find": lambda: self._do_find(arg),
+            "catalog": lambda: self._do_catalog(arg),
+            "refresh": lambda: self._do_refresh(use_cache=False),
+            "re": lambda: self._do_refresh(use_cache=False),
             "reload": lambda: self._do_reload(),
             "protocol": lambda: self._do_protocol(arg),
             "help": lambda: print(self.HELP_TEXT),
@@ -246,8 +272,10 @@ class Pan123CLI:
             r = self.core.cd_root()
         elif arg.isdigit():
             r = self.core.cd(int(arg) - 1)
+        elif arg:
+            r = self.core.cd_path(arg)
         else:
-            print("用法: cd [编号|..|/]")
+            print("用法: cd [编号|..|/|路径]")
             return
         if r["code"] != 0:
             self._print_result(r)
@@ -265,26 +293,115 @@ class Pan123CLI:
     def _do_upload(self, path: str) -> None:
         if not path:
             path = input("请输入文件路径: ")
-        r = self.core.upload_file(path, on_progress=self._upload_progress)
+        r = self.tool.upload_file(path, on_progress=self._upload_progress)
         if r["code"] == 5060:
             choice = input("检测到同名文件，输入 1 覆盖，2 保留两者，其他取消: ")
             if choice == "1":
-                r = self.core.upload_file(path, duplicate=1, on_progress=self._upload_progress)
+                r = self.tool.upload_file(path, duplicate=1, on_progress=self._upload_progress)
             elif choice == "2":
-                r = self.core.upload_file(path, duplicate=2, on_progress=self._upload_progress)
+                r = self.tool.upload_file(path, duplicate=2, on_progress=self._upload_progress)
             else:
                 print("上传取消")
                 return
         print()  # 换行
         self._print_result(r)
+        if r.get("data") and "files_per_sec" in r["data"]:
+            stats = r["data"]
+            print(f"共 {stats['files']} 个文件（秒传 {stats['reused']} 个），{format_size(stats['bytes'])}，"
+                  f"耗时 {stats['elapsed']:.1f}s，{format_size(int(stats['speed']))}/s，"
+                  f"{stats['files_per_sec']:.1f} 个文件/s")
         if r["code"] == 0:
             self._do_refresh()
 
+    def _do_uploads(self, arg: str) -> None:
+        """查看或清理未完成的上传会话"""
+        journal = self.core.upload_journal
+        if arg == "purge":
+            print(f"已清理 {journal.purge()} 个过期会话")
+            return
+        if arg == "clear":
+            print(f"已清除 {journal.purge(None)} 个会话")
+            return
+        sessions = journal.list_sessions()
+        if not sessions:
+            print("没有未完成的上传会话")
+            return
+        print("\n未完成的上传会话:")
+        for i, sess in enumerate(sessions, 1):
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(sess.get("updated", 0)))
+            print(f"  {i}. {sess.get('path', '?')} ({format_size(sess.get('size', 0))}, "
+                  f"已完成 {len(sess.get('parts', []))} 块, 更新于 {updated})")
+        print("输入 'uploads purge' 清理过期会话，'uploads clear' 清除全部会话")
+
+    def _do_sync(self, arg: str) -> None:
+        """比较当前目录与本地文件夹，显示同步计划，确认后执行"""
+        direction = "both"
+        head, _, tail = arg.rpartition(" ")
+        if tail.lower() in SYNC_DIRECTIONS:
+            arg, direction = head, tail.lower()
+        local_dir = arg.strip().strip('"') or input("请输入本地文件夹路径: ").strip().strip('"')
+        if not local_dir:
+            print("请提供本地文件夹路径")
+            return
+        r = self.tool.plan_sync(local_dir, direction=direction)
+        if r["code"] != 0:
+            self._print_result(r)
+            return
+        plan = r["data"]
+        labels = {"upload": colored("↑ 上传", Color.GREEN), "download": colored("↓ 下载", Color.CYAN),
+                  "conflict": colored("! 冲突", Color.RED)}
+        changes = [a for a in plan["actions"] if a["action"] in labels]
+        for action in changes[:self.SYNC_PREVIEW_LINES]:
+            print(f"{labels[action['action']]} {action['path']} ({format_size(action['size'])}，{action['reason']})")
+        if len(changes) > self.SYNC_PREVIEW_LINES:
+            print(f"... 共 {len(changes)} 项")
+        print(r["message"])
+        if not any(a["action"] not in ("skip", "conflict") for a in plan["actions"]):
+            print("没有需要同步的文件")
+            return
+        if input("输入 y 开始同步: ").strip().lower() != "y":
+            print("同步取消")
+            return
+        r = self.tool.sync(
+            local_dir, direction=direction, plan=plan,
+            on_progress=lambda e: print(
+                f"\r已完成 {e['done']}/{e['total']} 个文件，{format_size(e['bytes'])}/{format_size(e['total_bytes'])}",
+                end="     ", flush=True),
+        )
+        print()
+        self._print_result(r)
+        if r.get("data") and "elapsed" in r["data"]:
+            stats = r["data"]
+            print(f"上传 {stats['uploaded']} 个（秒传 {stats['reused']} 个），下载 {stats['downloaded']} 个，"
+                  f"跳过 {stats['skipped']} 个，冲突 {stats['conflicts']} 个，耗时 {stats['elapsed']:.1f}s")
+        self._do_refresh()
+
+    @staticmethod
+    def _parse_indices(arg: str) -> List[int]:
+        """解析 "1 3 5-8" 或 "1,3,5-8" 形式的编号，返回去重排序后的 0-based 下标，格式错误或含编号 0 时返回空列表"""
+        indices = set()
+        for token in arg.replace(",", " ").split():
+            start, sep, end = token.partition("-")
+            if not start.isdigit() or (sep and not end.isdigit()):
+                return []
+            first, last = sorted((int(start), int(end) if sep else int(start)))
+            if first == 0:
+                return []
+            indices.update(range(first - 1, last))
+        return sorted(indices)
+
+    def _trash_progress(self, event: Dict) -> None:
+        print(f"\r已处理 {event['done'] + event['failed']}/{event['total']} 项", end="     ", flush=True)
+
     def _do_rm(self, arg: str) -> None:
-        if not arg.isdigit():
-            print("请提供文件编号")
+        indices = self._parse_indices(arg)
+        if not indices:
+            print("请提供文件编号，如 rm 3、rm 1 4 7、rm 2-10")
+            return
+        if len(indices) > 1 and input(f"确认删除 {len(indices)} 项？输入 y 确认: ").strip().lower() != "y":
+            print("删除取消")
             return
-        r = self.core.trash_by_index(int(arg) - 1)
+        r = self.core.trash_by_indices(indices)
         self._print_result(r)
         if r["code"] == 0:
             self._do_refresh()
@@ -313,14 +430,43 @@ class Pan123CLI:
             self._show_files()
 
     def _do_link(self, arg: str) -> None:
-        if not arg.isdigit():
+        indices = [int(x) - 1 for x in arg.split() if x.isdigit()]
+        if not indices:
             print("请提供文件编号")
             return
-        r = self.core.get_download_url(int(arg) - 1)
-        if r["code"] == 0:
-            print(f"文件直链: \n{r['data']['url']}")
-        else:
-            self._print_result(r)
+        for i in indices:
+            if not (0 <= i < len(self.core.file_list)):
+                print(f"无效的文件编号: {i + 1}")
+                return
+        items = [self.core.file_list[i] for i in indices]
+        results = self.core.get_item_download_urls(items)["data"]
+        for item, r in zip(items, results):
+            if r["code"] == 0:
+                print(f"{item['FileName']} 直链: \n{r['data']['url']}")
+            else:
+                print(f"{item['FileName']}: ", end="")
+                self._print_result(r)
+
+    def _do_export(self, arg: str) -> None:
+        parts = arg.split(maxsplit=2)
+        if not parts or not parts[0].isdigit():
+            print("用法: export [编号] [aria2|curl] [输出文件]")
+            return
+        idx = int(parts[0]) - 1
+        if not (0 <= idx < len(self.core.file_list)):
+            print("无效的文件编号")
+            return
+        fmt = parts[1].lower() if len(parts) > 1 else "aria2"
+        out_file = parts[2] if len(parts) > 2 else ""
+        r = self.tool.export_links(
+            self.core.file_list[idx], out_file, fmt,
+            on_progress=lambda e: print(f"\r已解析 {e['done']} 个直链，失败 {e['failed']} 个", end="     ", flush=True),
+        )
+        print()
+        self._print_result(r)
+        if r.get("data"):
+            usage = "aria2c -i {} -x 8 -j 8" if fmt == "aria2" else "curl -K {} --parallel"
+            print(f"清单已写入 {r['data']['path']}，下载命令: {usage.format(r['data']['path'])}")
 
     def _do_download(self, arg: str) -> None:
         if not arg.isdigit():
@@ -368,26 +514,130 @@ class Pan123CLI:
         if not items:
             print("回收站为空")
             return
-        print("\n回收站内容:")
-        for i, item in enumerate(items, 1):
-            print(f"  {i}. {item['FileName']} ({format_size(item['Size'])})")
-        action = input("\n输入编号恢复文件，或输入 'clear' 清空回收站: ").strip()
-        if action.isdigit():
-            idx = int(action) - 1
-            if 0 <= idx < len(items):
-                rr = self.core.restore(items[idx]["FileId"])
-                self._print_result(rr)
-            else:
+        print(f"\n回收站内容（共 {len(items)} 项）:")
+        for i, item in enumerate(items[:self.RECYCLE_SHOW_MAX], 1):
+            print(f"  {i}. {item['FileName']} ({format_size(item['Size'])}, {item.get('UpdateAt', '')})")
+        if len(items) > self.RECYCLE_SHOW_MAX:
+            print(f"  ... 另有 {len(items) - self.RECYCLE_SHOW_MAX} 项未显示")
+        print("\n输入编号恢复文件（可多个或范围，如 1 3 5-8）；"
+              "'restore [通配符] [天数]' 批量恢复，'clear [通配符] [天数]' 清理（如 clear *.tmp 30，不带参数为全部）")
+        action = input("> ").strip()
+        command, _, rest = action.partition(" ")
+        if command in ("clear", "restore"):
+            args = rest.split()
+            # 只有一个数字参数时视为天数
+            if len(args) == 1 and args[0].replace(".", "", 1).isdigit():
+                args = ["", args[0]]
+            pattern = args[0] if args else ""
+            try:
+                older_than = float(args[1]) if len(args) > 1 else 0
+            except ValueError:
+                print("天数必须是数字")
+                return
+            targets = self.core.filter_recycle(items, pattern, older_than)
+            verb = "清理" if command == "clear" else "恢复"
+            if not targets:
+                print("没有匹配的条目")
+                return
+            if input(f"将{verb} {len(targets)} 项，输入 y 确认: ").strip().lower() != "y":
+                print(f"{verb}取消")
+                return
+            r = self.core.trash_many(targets, delete=command == "clear", on_progress=self._trash_progress)
+            print()
+            self._print_result(r)
+        elif action:
+            indices = self._parse_indices(action)
+            if not indices or indices[-1] >= len(items):
                 print("无效编号")
-        elif action == "clear":
-            for item in items:
-                self.core.trash(item, delete=True)
-            print("回收站已清空")
+            else:
+                r = self.core.restore_many([items[i] for i in indices], on_progress=self._trash_progress)
+                print()
+                self._print_result(r)
         self._do_refresh()
 
-    def _do_refresh(self) -> None:
+    def _do_find(self, query: str) -> None:
+        """服务端搜索，失败时在已获取过的目录列表中搜索"""
+        if not query:
+            query = input("请输入搜索关键字: ")
+        items = []
+        for r in self.core.search(query):
+            if r["code"] != 0:
+                self._print_result(r)
+                print("服务端搜索失败，改为在已加载的目录列表中搜索")
+                items = self.core.search_cached(query)["data"] or []
+                break
+            items.extend(r["data"]["items"])
+            if len(items) >= self.FIND_MAX_RESULTS:
+                break
+        if not items:
+            print("没有找到匹配的文件")
+            return
+        catalog = self._catalog
+        if catalog is None and os.path.exists(CATALOG_FILE):
+            catalog = self._catalog = Pan123Catalog(self.core, CATALOG_FILE)
+        for item in items[:self.FIND_MAX_RESULTS]:
+            path = self.core.path_of(item)
+            if path.startswith("…") and catalog is not None and catalog.get(item["FileId"]):
+                path = catalog.path_of(item["FileId"])
+            is_dir = item["Type"] == 1
+            type_str = "文件夹" if is_dir else "文件"
+            color = Color.PURPLE if is_dir else Color.YELLOW
+            print(colored(f"{type_str:<8}{format_size(item.get('Size', 0)):<12}{path}", color))
+        if len(items) > self.FIND_MAX_RESULTS:
+            print(f"仅显示前 {self.FIND_MAX_RESULTS} 条结果")
+
+    def _do_catalog(self, arg: str) -> None:
+        """本地目录库：crawl 全量遍历，sync 增量同步，du 统计目录大小，dup 查找重复文件，无参数显示概况"""
+        if self._catalog is None:
+            self._catalog = Pan123Catalog(self.core, CATALOG_FILE)
+        catalog = self._catalog
+        action, _, rest = arg.partition(" ")
+        if action == "crawl":
+            r = catalog.crawl(on_progress=lambda d: print(
+                f"\r已遍历 {d['folders']} 个文件夹，{d['files']} 个文件，待遍历 {d['pending']} 个文件夹",
+                end="     ", flush=True))
+            print()
+            self._print_result(r)
+            if r["code"] == 0:
+                print(f"共 {r['data']['folders']} 个文件夹，{r['data']['files']} 个文件，耗时 {r['data']['elapsed']:.1f}s")
+        elif action == "sync":
+            marks = {"add": colored("+", Color.GREEN), "modify": colored("~", Color.YELLOW), "delete": colored("-", Color.RED)}
+            r = catalog.sync(on_change=lambda e: print(f"{marks[e['change']]} {e['path']}"))
+            self._print_result(r)
+            if r["code"] == 0:
+                d = r["data"]
+                print(f"新增 {d['added']}，修改 {d['modified']}，删除 {d['deleted']}；"
+                      f"列出 {d['folders']} 个文件夹，跳过 {d['skipped']} 个未变化的文件夹，耗时 {d['elapsed']:.1f}s")
+        elif action == "du":
+            r = catalog.resolve_path(rest.strip() or "/")
+            if r["code"] != 0:
+                self._print_result(r)
+                return
+            size = catalog.folder_size(r["data"]["FileId"])["data"]
+            print(f"{rest.strip() or '/'}: {size['folders']} 个文件夹，{size['files']} 个文件，{format_size(size['size'])}")
+        elif action == "dup":
+            groups = catalog.duplicates(limit=20)["data"]
+            if not groups:
+                print("没有重复文件")
+                return
+            for group in groups:
+                print(f"\n{format_size(group['size'])} × {len(group['items'])}（可节省 {format_size(group['wasted'])}）")
+                for item in group["items"]:
+                    print(f"  {catalog.path_of(item['FileId'])}")
+        elif not action:
+            stats = catalog.stats()["data"]
+            if not stats["crawled_at"]:
+                print("目录库为空，输入 'catalog crawl' 遍历网盘")
+                return
+            crawled = time.strftime("%Y-%m-%d %H:%M", time.localtime(stats["crawled_at"]))
+            print(f"目录库: {stats['folders']} 个文件夹，{stats['files']} 个文件，"
+                  f"{format_size(stats['size'])}，遍历于 {crawled}")
+        else:
+            print("用法: catalog [crawl|sync|du [路径]|dup]")
+
+    def _do_refresh(self, use_cache: bool = True) -> None:
         self._download_mode = 0
-        r = self.core.refresh()
+        r = self.core.refresh(use_cache=use_cache)
         if r["code"] != 0:
             self._print_result(r)
         else:
@@ -444,7 +694,15 @@ class Pan123CLI:
     def _upload_progress(data) -> None:
         uploaded = data.get("uploaded", 0)
         total = data.get("total", 0)
-        if total > 0:
+        if data.get("type") == Pan123EventType.UPLOAD_DIRECTORY_PROGRESS:
+            print(
+                f"\r上传进度: {data['files_done']}/{data['files_total']} 个文件 | "
+                f"{format_size(uploaded)}/{format_size(total)} | {format_size(int(data['speed']))}/s | "
+                f"{data['files_per_sec']:.1f} 个文件/s",
+                end="     ",
+                flush=True,
+            )
+        elif total > 0:
             pct = uploaded / total * 100
             print(f"\r上传进度: {pct:.1f}%", end="", flush=True)
 
@@ -452,4 +710,6 @@ class Pan123CLI:
 # ──────────────── 入口 ────────────────
 
 if __name__ == "__main__":
+    # 文件夹上传使用进程池计算 MD5，打包为可执行文件后需要此调用
+    multiprocessing.freeze_support()
     Pan123CLI().run()
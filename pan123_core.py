@@ -8,17 +8,30 @@
     }
 """
 
+import calendar
+import fnmatch
 import hashlib
 import json
 import os
+import queue
 import random
 import re
+import sqlite3
+import sys
+import threading
 import time
 import uuid
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ════════════════════════════════════════════════════════════════
 #  全局常量 —— URL / 端点 / 超时 / 分块 / 设备信息
@@ -87,29 +100,158 @@ TIMEOUT_DOWNLOAD = 30
 TIMEOUT_TRASH = 10
 """删除 / 恢复操作超时"""
 
+# ── 连接池 / 重试 ────────────────────────────────────────────
+HTTP_POOL_SIZE = 16
+"""每个主机保持的最大连接数（连接池大小）"""
+
+HTTP_MAX_RETRIES = 3
+"""连接失败 / 网关错误时的最大重试次数（仅幂等请求重试读超时与状态码）"""
+
+HTTP_RETRY_BACKOFF = 0.5
+"""重试退避系数（秒），第 n 次重试前等待 backoff * 2^(n-1)"""
+
+HTTP_RETRY_STATUS = (500, 502, 503, 504)
+"""触发自动重试的 HTTP 状态码"""
+
 # ── 上传 / 下载参数 ──────────────────────────────────────────
 UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
 """分块上传单块大小（5 MB）"""
 
+UPLOAD_CONCURRENCY = 4
+"""分块上传的默认并发数（同时进行的 PUT 请求数）"""
+
+UPLOAD_PRESIGN_BATCH = 50
+"""每次批量获取的分块预签名 URL 数量"""
+
+UPLOAD_JOURNAL_FILE = "123pan_upload_sessions.json"
+"""分块上传会话记录文件的默认路径（由上层传入内核，内核默认不启用）"""
+
+UPLOAD_JOURNAL_STALE_DAYS = 7
+"""上传会话记录超过多少天未更新视为过期"""
+
+UPLOAD_HASH_WORKERS = 4
+"""文件夹上传时计算 MD5 的进程数"""
+
+UPLOAD_FILE_WORKERS = 8
+"""文件夹上传时同时上传的文件数（秒传检查与分块上传）"""
+
 DOWNLOAD_CHUNK_SIZE = 8192
 """下载流式读取单块大小（8 KB）"""
 
-MD5_READ_CHUNK_SIZE = 65536
-"""计算文件 MD5 时的读取块大小（64 KB）"""
+DOWNLOAD_SEGMENTS = 4
+"""分段下载的默认并发连接数（1 = 始终单连接下载）"""
+
+DOWNLOAD_MIN_SEGMENT_SIZE = 16 * 1024 * 1024
+"""分段下载时每段的最小大小（16 MB），文件过小时减少段数或退回单连接"""
+
+DOWNLOAD_TEMP_SUFFIX = ".123pan"
+"""下载临时文件后缀"""
+
+DOWNLOAD_JOURNAL_SUFFIX = ".123pan.json"
+"""断点续传记录文件后缀，记录文件标识（FileId / Etag / Size）与各段已完成字节数"""
+
+DOWNLOAD_JOURNAL_INTERVAL = 4 * 1024 * 1024
+"""每段每写入多少字节保存一次断点续传记录（4 MB）"""
+
+DOWNLOAD_RETRIES = 3
+"""下载失败后重新获取直链并续传的最大次数"""
+
+DOWNLOAD_LINK_WORKERS = 4
+"""文件夹下载时解析直链的并发线程数"""
+
+DOWNLOAD_FILE_WORKERS = 4
+"""文件夹下载时同时下载的文件数"""
+
+DOWNLOAD_QUEUE_SIZE = 64
+"""文件夹下载时待解析 / 待下载队列的容量，避免提前解析的直链过期"""
+
+MD5_READ_CHUNK_SIZE = 1024 * 1024
+"""计算文件 MD5 时的读取块大小（1 MB，复用同一缓冲区）"""
+
+HASH_CACHE_FILE = "123pan_hash_cache.db"
+"""文件 MD5 缓存数据库的默认路径（由上层传入内核，内核默认不启用）"""
 
 # ── 翻页 / 限频 ─────────────────────────────────────────────
 FILE_LIST_PAGE_LIMIT = 100
 """单页最大文件数"""
 
-RATE_LIMIT_INTERVAL = 10
-"""连续翻页时的限频等待秒数"""
+RATE_LIMIT_DEFAULT_RPS = 10.0
+"""未单独配置的接口每秒请求数上限"""
+
+RATE_LIMIT_BUDGETS: Dict[str, float] = {
+    URL_FILE_LIST: 5.0,
+    URL_DOWNLOAD_INFO: 10.0,
+    URL_BATCH_DOWNLOAD: 2.0,
+    URL_FILE_TRASH: 5.0,
+    URL_UPLOAD_REQUEST: 10.0,
+    URL_UPLOAD_PARTS: 20.0,
+}
+"""各接口每秒请求数上限（自适应限速的起始值和恢复上限）"""
+
+RATE_LIMIT_MIN_RPS = 0.2
+"""被限频后速率下降的下限（每秒请求数）"""
+
+RATE_LIMIT_INCREASE = 0.1
+"""每次请求成功后速率的线性增量（每秒请求数）"""
+
+RATE_LIMIT_DECREASE = 0.5
+"""被限频后速率的乘性衰减系数"""
 
-RATE_LIMIT_PAGES = 5
-"""每翻多少页触发一次限频等待"""
+RATE_LIMIT_COOLDOWN = 2.0
+"""被限频后该接口暂停的秒数（服务端返回 Retry-After 时以其为准）"""
+
+RATE_LIMIT_MAX_RETRIES = 3
+"""被限频后自动重试的最大次数"""
+
+RATE_LIMIT_CODES = (429,)
+"""表示请求过于频繁的业务码"""
 
 S3_MERGE_DELAY = 1
 """S3 分块合并后等待服务器处理的秒数"""
 
+# ── 目录列表缓存 ─────────────────────────────────────────────
+LISTING_CACHE_TTL = 60
+"""目录列表缓存有效期（秒），0 表示不缓存"""
+
+LISTING_CACHE_MAX_ENTRIES = 256
+"""目录列表缓存最多保存的页数"""
+
+LISTING_CACHE_MAX_BYTES = 32 * 1024 * 1024
+"""目录列表缓存的最大占用（按 JSON 序列化长度估算，32 MB）"""
+
+LINK_CACHE_DEFAULT_TTL = 300
+"""无法从直链参数中解析过期时间时，直链缓存的有效期（秒）"""
+
+LINK_CACHE_MARGIN = 30
+"""直链缓存相对签名过期时间提前失效的秒数"""
+
+LINK_CACHE_MAX_ENTRIES = 4096
+"""直链缓存最多保存的条目数"""
+
+LINK_RESOLVE_WORKERS = 8
+"""get_item_download_urls() 批量解析直链的并发线程数"""
+
+EXPORT_FORMATS = ("aria2", "curl")
+"""export_links() 支持的清单格式：aria2c 输入文件（-i）、curl 配置文件（-K）"""
+
+SYNC_DIRECTIONS = ("up", "down", "both")
+"""sync() 支持的同步方向：本地 → 远程、远程 → 本地、双向（以较新的一侧为准）"""
+
+TRASH_BATCH_SIZE = 100
+"""trash_many() / restore_many() 单次请求提交的最大条目数"""
+
+TRASH_WORKERS = 4
+"""trash_many() / restore_many() 并发提交批次的线程数"""
+
+LIST_PAGE_WORKERS = 4
+"""list_dir_all() 已知总数后并发获取剩余页的线程数"""
+
+PATH_INDEX_MAX_ENTRIES = 200000
+"""路径索引最多记录的 (父目录, 名称) 条目数"""
+
+FILE_ENTRY_FIELDS = ("FileId", "FileName", "Type", "Size", "Etag", "S3KeyFlag", "ParentFileId", "UpdateAt")
+"""FileEntry 保存的字段，即内核实际读取的列表字段"""
+
 # ── 业务错误码 ───────────────────────────────────────────────
 CODE_OK = 0
 """统一成功码"""
@@ -123,6 +265,12 @@ CODE_DUPLICATE_FILE = 5060
 CODE_CONFLICT = 1
 """自定义：本地文件冲突（下载时目标已存在）"""
 
+CODE_CHECKSUM_MISMATCH = -4
+"""自定义：下载完成但 MD5 与 Etag 不一致"""
+
+CODE_UPLOAD_SESSION_GONE = -5
+"""自定义：分块上传会话在服务端已不存在（S3 返回 NoSuchUpload），续传记录随之作废"""
+
 # ── 设备信息池（Android 协议伪装）─────────────────────────────
 DEVICE_TYPES: List[str] = [
     "24075RP89G", "24076RP19G", "24076RP19I", "M1805E10A", "M2004J11G",
@@ -165,6 +313,12 @@ class Pan123EventType:
     DOWNLOAD_START_DIRECTORY = "download_start_directory"
     DOWNLOAD_PROGRESS: str = "download_progress"
     UPLOAD_PROGRESS: str = "upload_progress"
+    UPLOAD_DIRECTORY_PROGRESS: str = "upload_directory_progress"
+    CATALOG_PROGRESS: str = "catalog_progress"
+    CATALOG_CHANGE: str = "catalog_change"
+    EXPORT_PROGRESS: str = "export_progress"
+    SYNC_PROGRESS: str = "sync_progress"
+    TRASH_PROGRESS: str = "trash_progress"
 
 
 # ════════════════════════════════════════════════════════════════
@@ -200,6 +354,14 @@ def format_size(size_bytes: int) -> str:
     return f"{size_bytes} B"
 
 
+def _parse_update_time(value: Any) -> Optional[float]:
+    """将 UpdateAt（ISO 8601，如 "2024-05-01T12:00:00+08:00"）转换为时间戳，无法解析时返回 None。"""
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
 def calc_file_md5(file_path: str) -> str:
     """计算文件的 MD5 哈希值。
 
@@ -213,12 +375,142 @@ def calc_file_md5(file_path: str) -> str:
         IOError: 文件读取失败时抛出。
     """
     md5 = hashlib.md5()
-    with open(file_path, "rb") as f:
-        while chunk := f.read(MD5_READ_CHUNK_SIZE):
-            md5.update(chunk)
+    buf = bytearray(MD5_READ_CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(file_path, "rb", buffering=0) as f:
+        while n := f.readinto(buf):
+            md5.update(view[:n])
     return md5.hexdigest()
 
 
+class HashCache:
+    """本地文件 MD5 持久化缓存（SQLite）。
+
+    以 (st_dev, st_ino, 文件大小, st_mtime_ns) 为键，文件未变化时直接返回缓存的 MD5，
+    避免重复读取整个文件。文件被修改、替换或移动到其它设备后键随之变化，缓存自然失效。
+    可在多线程中共享同一实例。
+
+    Args:
+        path: 数据库文件路径。
+    """
+
+    def __init__(self, path: str = HASH_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_md5 ("
+            " dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, md5 TEXT NOT NULL,"
+            " PRIMARY KEY (dev, ino, size, mtime_ns))"
+        )
+        self._conn.commit()
+
+    def get(self, st: os.stat_result) -> Optional[str]:
+        """根据 os.stat() 结果查询缓存的 MD5，未命中返回 None。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT md5 FROM file_md5 WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+                (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, st: os.stat_result, md5: str) -> None:
+        """写入缓存，同一 inode 的旧记录会被替换。"""
+        with self._lock:
+            self._conn.execute("DELETE FROM file_md5 WHERE dev = ? AND ino = ?", (st.st_dev, st.st_ino))
+            self._conn.execute(
+                "INSERT INTO file_md5 (dev, ino, size, mtime_ns, md5) VALUES (?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, md5),
+            )
+            self._conn.commit()
+
+    def file_md5(self, file_path: str, st: Optional[os.stat_result] = None) -> str:
+        """返回文件 MD5，优先使用缓存，未命中时计算并写入缓存。
+
+        Raises:
+            IOError: 文件读取失败时抛出。
+        """
+        st = st or os.stat(file_path)
+        md5 = self.get(st)
+        if md5 is None:
+            md5 = calc_file_md5(file_path)
+            # 计算期间文件被修改则不缓存
+            if os.stat(file_path).st_mtime_ns == st.st_mtime_ns:
+                self.put(st, md5)
+        return md5
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ════════════════════════════════════════════════════════════════
+#  文件条目
+# ════════════════════════════════════════════════════════════════
+
+_FILE_ENTRY_FIELD_SET = frozenset(FILE_ENTRY_FIELDS)
+
+
+class FileEntry(Mapping):
+    """列表接口返回条目的紧凑表示。
+
+    列表接口的每个条目带有二十多个字段，以 dict 保存时每条约占 1～2 KB；FileEntry 用 __slots__
+    只保存 FILE_ENTRY_FIELDS，约为原来的几分之一，适合在内存中保存百万级条目的目录树。
+
+    提供只读映射接口，item["FileName"]、item.get("Etag")、"Size" in item、dict(item) 等
+    按字典访问的写法无需修改；原始条目中不存在的字段同样抛出 KeyError。
+    其余字段默认丢弃，from_dict(keep_extra=True) 时另存一份，可通过 raw 取回完整字典。
+    """
+
+    __slots__ = FILE_ENTRY_FIELDS + ("_extra",)
+
+    @classmethod
+    def from_dict(cls, data: Mapping, keep_extra: bool = False) -> "FileEntry":
+        """由列表接口返回的条目字典构造，已是 FileEntry 时原样返回。"""
+        if isinstance(data, FileEntry):
+            return data
+        entry = cls.__new__(cls)
+        for field in FILE_ENTRY_FIELDS:
+            if field in data:
+                setattr(entry, field, data[field])
+        # 同一账号下 S3KeyFlag 几乎都相同，驻留后所有条目共享同一个字符串
+        if isinstance(data.get("S3KeyFlag"), str):
+            entry.S3KeyFlag = sys.intern(data["S3KeyFlag"])
+        extra = {k: v for k, v in data.items() if k not in _FILE_ENTRY_FIELD_SET} if keep_extra else None
+        entry._extra = extra or None
+        return entry
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """按需重建的条目字典（包含保存的其余字段）。"""
+        return dict(self)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FILE_ENTRY_FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for field in FILE_ENTRY_FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"FileEntry({dict(self)!r})"
+
+
 # ════════════════════════════════════════════════════════════════
 #  进度回调类型别名
 # ════════════════════════════════════════════════════════════════
@@ -231,6 +523,613 @@ ProgressCallback = Optional[Callable[..., None]]
 """
 
 
+class TokenBucket:
+    """线程安全的令牌桶限速器。
+
+    consume() 允许令牌透支：一次取走超过桶容量的令牌时，按透支量阻塞等待，
+    因此也可用于按字节限速（每次消耗一个数据块的字节数）。
+
+    Args:
+        rate:     每秒补充的令牌数，小于等于 0 表示不限速。
+        capacity: 桶容量（允许的突发量），默认等于 rate。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self, n: float = 1.0) -> float:
+        """取走 n 个令牌但不阻塞，返回调用方应等待的秒数（供 asyncio 等场景自行等待）。"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self._tokens -= n
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def consume(self, n: float = 1.0) -> None:
+        """取走 n 个令牌，令牌不足时阻塞到补足为止。"""
+        wait = self.reserve(n)
+        if wait > 0:
+            time.sleep(wait)
+
+    def set_rate(self, rate: float, capacity: Optional[float] = None) -> None:
+        """调整速率（及容量），已积累的令牌按新容量截断。"""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity if capacity is not None else rate
+            self._tokens = min(self._tokens, self.capacity)
+
+    def pause(self, seconds: float) -> None:
+        """清空令牌并透支 seconds 秒的量，之后的 consume() 至少等待 seconds 秒。"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class ListingCache:
+    """目录列表分页缓存，带 TTL 与 LRU 淘汰。
+
+    以 (parentFileId, page, limit) 为键缓存 list_dir() 的结果，超过 ttl 秒的条目视为过期；
+    条目数超过 max_entries 或估算大小超过 max_bytes 时淘汰最久未使用的条目。
+    可在多线程中共享同一实例。
+
+    Args:
+        ttl:         有效期（秒），小于等于 0 表示不缓存。
+        max_entries: 最多缓存的页数。
+        max_bytes:   最大占用字节数（按 JSON 序列化长度估算）。
+    """
+
+    def __init__(
+            self,
+            ttl: float = LISTING_CACHE_TTL,
+            max_entries: int = LISTING_CACHE_MAX_ENTRIES,
+            max_bytes: int = LISTING_CACHE_MAX_BYTES,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, Dict]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        """读取未过期的缓存数据 {"items": [...], "total": int}，未命中返回 None。"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def put(self, key: Tuple, data: Dict) -> None:
+        """写入缓存并按 LRU 淘汰超出上限的条目。"""
+        if self.ttl <= 0:
+            return
+        size = len(json.dumps(data, ensure_ascii=False, default=dict))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, data)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, parent_id: Optional[int] = None) -> None:
+        """使指定目录的全部分页失效；parent_id 为 None 时清空整个缓存。"""
+        with self._lock:
+            if parent_id is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for key in [k for k in self._entries if k[0] == int(parent_id)]:
+                self._drop(key)
+
+    def _drop(self, key: Tuple) -> None:
+        self._bytes -= self._entries.pop(key)[1]
+
+
+class LinkCache:
+    """文件直链缓存，以 (FileId, Etag) 为键。
+
+    每条直链的有效期由签名参数推算（auth_key 中的时间戳、expires / e 参数、
+    X-Amz-Date + X-Amz-Expires），并提前 LINK_CACHE_MARGIN 秒失效；无法解析时使用 default_ttl。
+    条目数超过 max_entries 时淘汰最早写入的条目。可在多线程中共享同一实例。
+
+    Args:
+        default_ttl: 无法解析过期时间时的有效期（秒），小于等于 0 表示不缓存。
+        max_entries: 最多缓存的条目数。
+    """
+
+    def __init__(self, default_ttl: float = LINK_CACHE_DEFAULT_TTL, max_entries: int = LINK_CACHE_MAX_ENTRIES):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(item: Dict[str, Any]) -> Tuple[int, str]:
+        return int(item["FileId"]), item.get("Etag") or ""
+
+    def get(self, item: Dict[str, Any]) -> Optional[str]:
+        """返回未过期的直链，未命中返回 None。"""
+        key = self._key(item)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def put(self, item: Dict[str, Any], url: str) -> None:
+        if self.default_ttl <= 0:
+            return
+        expires = self.url_expiry(url)
+        expires = expires - LINK_CACHE_MARGIN if expires else time.time() + self.default_ttl
+        if expires <= time.time():
+            return
+        with self._lock:
+            self._entries[self._key(item)] = (expires, url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, item: Dict[str, Any]) -> None:
+        """删除条目（直链下载失败后调用，下次重新获取）。"""
+        with self._lock:
+            self._entries.pop(self._key(item), None)
+
+    @staticmethod
+    def url_expiry(url: str) -> Optional[float]:
+        """从签名直链的查询参数中解析过期时间（Unix 时间戳），无法解析返回 None。"""
+        query = {k.lower(): v[0] for k, v in parse_qs(urlparse(url).query).items()}
+        # CDN 鉴权 auth_key=<过期时间戳>-<随机数>-<uid>-<签名>
+        auth_key = query.get("auth_key", "").split("-")[0]
+        if auth_key.isdigit():
+            return float(auth_key)
+        for name in ("expires", "e", "x-oss-expires"):
+            if query.get(name, "").isdigit():
+                return float(query[name])
+        if query.get("x-amz-expires", "").isdigit() and query.get("x-amz-date"):
+            try:
+                signed = calendar.timegm(time.strptime(query["x-amz-date"], "%Y%m%dT%H%M%SZ"))
+            except ValueError:
+                return None
+            return signed + int(query["x-amz-expires"])
+        return None
+
+
+class PathIndex:
+    """(父目录 FileId, 文件名) → 条目 的内存索引，供路径解析使用。
+
+    由 list_dir() 在每次从服务端取到列表时顺带填充，超过 max_entries 时淘汰最久未使用的条目。
+    可在多线程中共享同一实例。
+
+    Args:
+        max_entries: 最多记录的条目数。
+    """
+
+    def __init__(self, max_entries: int = PATH_INDEX_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], Dict[str, Any]]" = OrderedDict()
+        self._locations: Dict[int, Tuple[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, items: List[Dict[str, Any]], parent_id: Optional[int] = None) -> None:
+        """记录一批条目；parent_id 为 None 时使用条目自身的 ParentFileId。"""
+        with self._lock:
+            for item in items:
+                pid = parent_id if parent_id is not None else item.get("ParentFileId")
+                if pid is None:
+                    continue
+                key = (int(pid), item["FileName"])
+                self._entries[key] = item
+                self._entries.move_to_end(key)
+                self._locations[int(item["FileId"])] = key
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def get(self, parent_id: int, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get((int(parent_id), name))
+            if item is not None:
+                self._entries.move_to_end((int(parent_id), name))
+            return item
+
+    def forget(self, parent_id: Optional[int] = None) -> None:
+        """删除指定目录下的全部条目；parent_id 为 None 时清空索引。"""
+        with self._lock:
+            if parent_id is None:
+                self._entries.clear()
+                self._locations.clear()
+                return
+            for key in [k for k in self._entries if k[0] == int(parent_id)]:
+                self._discard(key)
+
+    def locate(self, file_id: int) -> Optional[Tuple[int, str]]:
+        """返回条目的 (父目录 FileId, 文件名)，未记录时返回 None。"""
+        with self._lock:
+            return self._locations.get(int(file_id))
+
+    def find(self, query: str) -> List[Dict[str, Any]]:
+        """返回文件名包含 query（不区分大小写）的全部已记录条目。"""
+        query = query.lower()
+        with self._lock:
+            return [item for key, item in self._entries.items() if query in key[1].lower()]
+
+    def _discard(self, key: Tuple[int, str]) -> None:
+        item = self._entries.pop(key)
+        if self._locations.get(int(item["FileId"])) == key:
+            del self._locations[int(item["FileId"])]
+
+
+class AdaptiveRateLimiter:
+    """按接口分别限速的自适应限速器（AIMD）。
+
+    每个接口一个令牌桶，起始速率为 budgets 中该接口的上限（缺省 default_rate）。
+    请求成功时速率线性增加 increase，直到上限；被限频（HTTP 429、限频业务码、超时）时
+    速率乘以 decrease（不低于 min_rate），并暂停该接口 cooldown 秒。
+    暂停期间同一接口的其余限频反馈（多为同时在途的请求）不再重复降速，
+    避免 N 个并发请求同时被限频时速率下降 2^N 倍。
+    可在多线程中共享同一实例。
+
+    Args:
+        budgets:      接口路径 -> 每秒请求数上限。
+        default_rate: 未配置接口的每秒请求数上限。
+        min_rate:     速率下限。
+        increase:     每次成功后的速率增量。
+        decrease:     被限频后的速率衰减系数。
+        cooldown:     被限频后的暂停秒数。
+    """
+
+    def __init__(
+            self,
+            budgets: Optional[Dict[str, float]] = None,
+            default_rate: float = RATE_LIMIT_DEFAULT_RPS,
+            min_rate: float = RATE_LIMIT_MIN_RPS,
+            increase: float = RATE_LIMIT_INCREASE,
+            decrease: float = RATE_LIMIT_DECREASE,
+            cooldown: float = RATE_LIMIT_COOLDOWN,
+    ):
+        self.budgets = dict(RATE_LIMIT_BUDGETS if budgets is None else budgets)
+        self.default_rate = default_rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._throttled_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(endpoint)
+            if bucket is None:
+                rate = self.budgets.get(endpoint, self.default_rate)
+                bucket = self._buckets[endpoint] = TokenBucket(rate, capacity=max(1.0, rate))
+            return bucket
+
+    def rate(self, endpoint: str) -> float:
+        """接口当前的每秒请求数。"""
+        return self._bucket(endpoint).rate
+
+    def acquire(self, endpoint: str) -> None:
+        """发送请求前调用，按接口当前速率阻塞等待。"""
+        self._bucket(endpoint).consume()
+
+    def reserve(self, endpoint: str) -> float:
+        """acquire() 的非阻塞版本，返回发送请求前应等待的秒数。"""
+        return self._bucket(endpoint).reserve()
+
+    def on_success(self, endpoint: str) -> None:
+        """请求未被限频：速率线性增加。"""
+        bucket = self._bucket(endpoint)
+        ceiling = self.budgets.get(endpoint, self.default_rate)
+        if bucket.rate < ceiling:
+            rate = min(ceiling, bucket.rate + self.increase)
+            bucket.set_rate(rate, capacity=max(1.0, rate))
+
+    def on_throttle(self, endpoint: str, retry_after: float = 0.0) -> None:
+        """请求被限频：速率乘性下降并暂停，同一暂停窗口内只生效一次。"""
+        bucket = self._bucket(endpoint)
+        pause = retry_after or self.cooldown
+        now = time.monotonic()
+        with self._lock:
+            if now < self._throttled_until.get(endpoint, 0.0):
+                return
+            self._throttled_until[endpoint] = now + pause
+        rate = max(self.min_rate, bucket.rate * self.decrease)
+        bucket.set_rate(rate, capacity=max(1.0, rate))
+        bucket.pause(pause)
+
+
+class _TransferProgress:
+    """多线程共享的传输进度累加器。
+
+    汇总各工作线程的字节数，并在锁内串行调用进度回调，
+    保证回调收到的 downloaded 单调递增且不会被并发调用。
+    """
+
+    def __init__(self, total: int, on_progress: ProgressCallback = None, done: int = 0):
+        self.total = total
+        self.done = done
+        self._base = done
+        self._on_progress = on_progress
+        self._start = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, n: int) -> None:
+        with self._lock:
+            self.done += n
+            if self._on_progress:
+                elapsed = time.time() - self._start
+                self._on_progress({
+                    "type": Pan123EventType.DOWNLOAD_PROGRESS,
+                    "downloaded": self.done,
+                    "total": self.total,
+                    "speed": (self.done - self._base) / elapsed if elapsed > 0 else 0.0,
+                })
+
+
+class _PrefixMD5:
+    """按文件偏移顺序增量计算分段下载文件的 MD5。
+
+    MD5 只能顺序计算：恰好位于已计算位置 pos 的数据块在写入时直接计算（feed）；
+    其余分段的数据在 flush 并更新 done 后，由 advance() 从临时文件补读计算。
+    下载过程中即可推进，结束时通常只剩少量数据需要补算，续传时已下载的部分也在此补读。
+    """
+
+    def __init__(self, temp_path: str, segments: List[List[int]]):
+        self.pos = 0
+        self._md5 = hashlib.md5()
+        self._path = temp_path
+        self._segments = sorted(segments, key=lambda seg: seg[0])
+        self._lock = threading.Lock()
+
+    def feed(self, offset: int, data: bytes) -> None:
+        """写入 [offset, offset + len(data)) 后调用，数据恰好接续 pos 时直接计算。"""
+        with self._lock:
+            if offset == self.pos:
+                self._md5.update(data)
+                self.pos += len(data)
+
+    def advance(self, wait: bool = False) -> None:
+        """补读 pos 之后连续且已 flush 的数据。wait=False 时其他线程正在计算则直接返回。"""
+        if not self._lock.acquire(blocking=wait):
+            return
+        try:
+            with open(self._path, "rb") as f:
+                for start, end, done in self._segments:
+                    if self.pos > end:
+                        continue
+                    if self.pos < start:
+                        break
+                    flushed = start + done
+                    if self.pos < flushed:
+                        f.seek(self.pos)
+                        while self.pos < flushed:
+                            data = f.read(min(MD5_READ_CHUNK_SIZE, flushed - self.pos))
+                            if not data:
+                                return
+                            self._md5.update(data)
+                            self.pos += len(data)
+                    if self.pos <= end:
+                        break
+        finally:
+            self._lock.release()
+
+    def hexdigest(self) -> str:
+        """补读剩余数据并返回 MD5（应在所有分段完成后调用）。"""
+        self.advance(wait=True)
+        return self._md5.hexdigest()
+
+
+class _BufferPool:
+    """可复用的定长缓冲区池，用于分块上传时读取分块数据。
+
+    分块以 readinto 读入池中的 bytearray，并以 memoryview 切片作为请求体发送，
+    不再为每个分块分配新的 bytes 对象，也不在 Python 中复制分块数据。
+    池内没有空闲缓冲区时直接分配新的（不阻塞），归还时最多保留 max_idle 个，
+    因此内存占用约为 同时在途的分块数 × size。可在多线程中共享同一实例。
+    """
+
+    def __init__(self, size: int, max_idle: int):
+        self.size = size
+        self.max_idle = max_idle
+        self._free: List[bytearray] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bytearray:
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return bytearray(self.size)
+
+    def release(self, buf: bytearray) -> None:
+        with self._lock:
+            if len(self._free) < self.max_idle:
+                self._free.append(buf)
+
+    def read_part(self, file_path: str, part_number: int) -> Tuple[bytearray, memoryview]:
+        """将第 part_number 块读入池中的缓冲区，返回 (缓冲区, 有效数据的 memoryview)。
+
+        请求发送完毕后须 release() 缓冲区；读取失败时缓冲区已归还并抛出 IOError。
+        """
+        buf = self.acquire()
+        try:
+            with open(file_path, "rb", buffering=0) as f:
+                f.seek((part_number - 1) * self.size)
+                n = 0
+                while n < self.size and (read := f.readinto(memoryview(buf)[n:])):
+                    n += read
+        except BaseException:
+            self.release(buf)
+            raise
+        return buf, memoryview(buf)[:n]
+
+
+# ════════════════════════════════════════════════════════════════
+#  上传会话记录
+# ════════════════════════════════════════════════════════════════
+
+class UploadJournal:
+    """分块上传会话记录，持久化到本地 JSON 文件，用于中断后续传。
+
+    每条记录以 本地路径 / 大小 / 修改时间 / MD5 / 目标目录 为键，保存 upload_request 返回的
+    Bucket、StorageNode、Key、UploadId、FileId 以及服务端已确认的分块号。
+    文件内容或目标目录变化后键随之变化，旧记录不会被误用。
+
+    会话的新建与删除重写整个记录文件；分块确认只向旁边的 "<path>.parts" 追加一行，
+    每个分块的写入量与会话数、分块数无关。加载时回放该日志，下次重写记录文件时清空。
+
+    Args:
+        path: 记录文件路径。
+    """
+
+    def __init__(self, path: str = UPLOAD_JOURNAL_FILE):
+        self.path = path
+        self.log_path = path + ".parts"
+        self._lock = threading.Lock()
+        self._sessions: Optional[Dict[str, Dict]] = None
+        self._log = None
+
+    @staticmethod
+    def make_key(file_path: str, size: int, mtime_ns: int, md5: str, parent_id: int) -> str:
+        """生成会话键。"""
+        return f"{os.path.abspath(file_path)}|{size}|{mtime_ns}|{md5}|{parent_id}"
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._sessions is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._sessions = json.load(f)
+            except (OSError, ValueError):
+                self._sessions = {}
+            self._replay_log()
+        return self._sessions
+
+    def _replay_log(self) -> None:
+        """将分块确认日志合并进内存中的会话记录。"""
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                key, part_number, updated = json.loads(line)
+            except (ValueError, TypeError):
+                # 进程中断时最后一行可能不完整
+                continue
+            session = self._sessions.get(key)
+            if session is not None and part_number not in session["parts"]:
+                session["parts"].append(part_number)
+                session["updated"] = max(session.get("updated", 0), updated)
+
+    def _save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._sessions, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        # 日志内容已并入记录文件
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        try:
+            os.remove(self.log_path)
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Dict]:
+        """获取会话记录，不存在时返回 None。"""
+        with self._lock:
+            session = self._load().get(key)
+            return dict(session) if session else None
+
+    def put(self, key: str, session: Dict) -> None:
+        """新建或覆盖会话记录。"""
+        with self._lock:
+            now = time.time()
+            self._load()[key] = {"parts": [], "created": now, **session, "updated": now}
+            self._save()
+
+    def mark_part(self, key: str, part_number: int) -> None:
+        """记录服务端已确认的分块号。"""
+        with self._lock:
+            session = self._load().get(key)
+            if session is None:
+                return
+            session["parts"].append(part_number)
+            session["updated"] = time.time()
+            if self._log is None:
+                self._log = open(self.log_path, "a", encoding="utf-8")
+            self._log.write(json.dumps([key, part_number, session["updated"]], ensure_ascii=False) + "\n")
+            self._log.flush()
+
+    def remove(self, key: str) -> None:
+        """删除会话记录。"""
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._save()
+
+    def list_sessions(self) -> List[Dict]:
+        """列出全部会话记录（附带键 "key"），按更新时间倒序。"""
+        with self._lock:
+            sessions = [{"key": k, **v} for k, v in self._load().items()]
+        return sorted(sessions, key=lambda x: x.get("updated", 0), reverse=True)
+
+    def purge(self, max_age_days: Optional[float] = UPLOAD_JOURNAL_STALE_DAYS) -> int:
+        """清理过期会话：超过 max_age_days 天未更新，或本地文件已删除 / 已修改。
+
+        Args:
+            max_age_days: 过期天数，None 表示清除全部记录。
+
+        Returns:
+            被清理的记录数。
+        """
+        with self._lock:
+            sessions = self._load()
+            now = time.time()
+            stale = []
+            for k, v in sessions.items():
+                if max_age_days is None or now - v.get("updated", 0) > max_age_days * 86400:
+                    stale.append(k)
+                    continue
+                try:
+                    st = os.stat(v["path"])
+                    if st.st_size != v["size"] or st.st_mtime_ns != v["mtime_ns"]:
+                        stale.append(k)
+                except (OSError, KeyError):
+                    stale.append(k)
+            for k in stale:
+                del sessions[k]
+            if stale:
+                self._save()
+            return len(stale)
+
+    def close(self) -> None:
+        """关闭分块确认日志。"""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
 # ════════════════════════════════════════════════════════════════
 #  内核类
 # ════════════════════════════════════════════════════════════════
@@ -252,7 +1151,7 @@ class Pan123Core:
         cwd_id (int):           当前工作目录 FileId（0 = 根目录）。
         cwd_stack (List[int]):  目录 ID 导航栈。
         cwd_name_stack (List[str]): 目录名称导航栈。
-        file_list (List[Dict]): 当前目录已加载的文件 / 文件夹列表。
+        file_list (List[FileEntry]): 当前目录已加载的文件 / 文件夹列表。
         file_total (int):       当前目录文件总数（服务端返回）。
         all_loaded (bool):      当前目录是否已全部加载。
         cookies (Optional[Dict]): 登录后保存的 Cookie。
@@ -279,6 +1178,15 @@ class Pan123Core:
             device_type: str = "",
             os_version: str = "",
             # config_file: str = "123pan_config.json",
+            pool_size: int = HTTP_POOL_SIZE,
+            max_retries: int = HTTP_MAX_RETRIES,
+            keep_alive: bool = True,
+            upload_concurrency: int = UPLOAD_CONCURRENCY,
+            upload_journal_file: str = "",
+            hash_cache_file: str = "",
+            api_rate_limit: bool = True,
+            listing_cache_ttl: float = LISTING_CACHE_TTL,
+            keep_raw_fields: bool = False,
     ):
         """初始化内核实例。
 
@@ -291,6 +1199,16 @@ class Pan123Core:
             device_type:   指定 Android 设备型号，为空则随机选取。
             os_version:    指定 Android 系统版本，为空则随机选取。
                 use_config_file: 是否在初始化时自动从配置文件加载账号信息和 Token，默认为 False，以避免内核直接依赖文件系统
+            pool_size:     每个主机的连接池大小，并发上传 / 下载时应不小于并发数。
+            max_retries:   连接失败、幂等请求读超时或网关错误时的最大重试次数，0 表示不重试（API 请求唯一的重试层）。
+            keep_alive:    是否复用 TCP / TLS 连接，False 时每次请求后关闭连接。
+            upload_concurrency: 分块上传的并发 PUT 数，内存占用约为 并发数 × UPLOAD_CHUNK_SIZE。
+            upload_journal_file: 分块上传会话记录文件路径，为空则不记录（中断后无法续传）。
+            hash_cache_file: 文件 MD5 缓存数据库路径，为空则每次上传都重新计算 MD5。
+            api_rate_limit: 是否对 API 请求启用自适应限速（AdaptiveRateLimiter），所有接口调用共享。
+            listing_cache_ttl: 目录列表缓存有效期（秒），0 表示不缓存。
+                               mkdir / trash / restore / upload_file 会自动使相关目录的缓存失效。
+            keep_raw_fields: 列表条目（FileEntry）是否保留 FILE_ENTRY_FIELDS 以外的字段，默认丢弃以节省内存。
         """
         # 账号信息
         self.user_name: str = user_name
@@ -316,10 +1234,30 @@ class Pan123Core:
         self.file_total: int = 0
         self.all_loaded: bool = False
         self._page: int = 0
+        self._use_cache: bool = True
 
         # Cookies
         self.cookies: Optional[Dict] = None
 
+        # 连接池：session 用于 123pan API（携带认证请求头），
+        # transfer_session 用于 CDN / S3 等第三方地址（不携带认证请求头，避免泄露 Token）
+        self.pool_size: int = pool_size
+        self.max_retries: int = max_retries
+        self.keep_alive: bool = keep_alive
+        self.session: requests.Session = self._new_session()
+        self.transfer_session: requests.Session = self._new_session()
+        self.upload_concurrency: int = max(1, upload_concurrency)
+        self._part_buffers: _BufferPool = _BufferPool(UPLOAD_CHUNK_SIZE, self.upload_concurrency)
+        self.upload_journal: Optional[UploadJournal] = (
+            UploadJournal(upload_journal_file) if upload_journal_file else None
+        )
+        self.hash_cache: Optional[HashCache] = HashCache(hash_cache_file) if hash_cache_file else None
+        self.rate_limiter: Optional[AdaptiveRateLimiter] = AdaptiveRateLimiter() if api_rate_limit else None
+        self.listing_cache: ListingCache = ListingCache(ttl=listing_cache_ttl)
+        self.path_index: PathIndex = PathIndex()
+        self.link_cache: LinkCache = LinkCache()
+        self.keep_raw_fields: bool = keep_raw_fields
+
         # 请求头
         self.headers: Dict[str, str] = {}
         self._build_headers()
@@ -328,6 +1266,49 @@ class Pan123Core:
         self.nick_name = None
         self.uid = None
 
+    # ════════════════════════════════════════════════════════════
+    #  连接池
+    # ════════════════════════════════════════════════════════════
+
+    def _new_session(self) -> requests.Session:
+        """创建带连接池与重试策略的 Session。
+
+        连接错误对所有方法都会重试；读超时与 HTTP_RETRY_STATUS 仅对幂等方法
+        （GET / PUT / HEAD 等）重试，POST 不会因此被重复提交。
+        """
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=HTTP_RETRY_BACKOFF,
+            status_forcelist=HTTP_RETRY_STATUS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self) -> None:
+        """关闭连接池及 MD5 缓存数据库。"""
+        self.session.close()
+        self.transfer_session.close()
+        if self.hash_cache:
+            self.hash_cache.close()
+
+    def _apply_session_headers(self) -> None:
+        """将 self.headers 应用到 API session（保留 requests 的默认头）。"""
+        headers = requests.utils.default_headers()
+        headers.update(self.headers)
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+        self.session.headers = headers
+
     # ════════════════════════════════════════════════════════════
     #  请求头构建
     # ════════════════════════════════════════════════════════════
@@ -376,12 +1357,14 @@ class Pan123Core:
                 "app-version": ANDROID_APP_VERSION,
                 "x-app-version": ANDROID_X_APP_VERSION,
             }
+        self._apply_session_headers()
 
     def _sync_authorization(self) -> None:
-        """将 self.authorization 同步到 headers 中（兼容大小写 key）。"""
+        """将 self.authorization 同步到 headers 及 API session 中（兼容大小写 key）。"""
         for key in ("authorization", "Authorization"):
             if key in self.headers:
                 self.headers[key] = self.authorization
+        self._apply_session_headers()
 
     # ════════════════════════════════════════════════════════════
     #  配置持久化
@@ -456,6 +1439,11 @@ class Pan123Core:
         内部方法，自动拼接 API_BASE_URL（当 path 以 "/" 开头时），
         统一处理网络异常和 JSON 解析。
 
+        启用 rate_limiter 时，请求按接口路径限速；被限频（HTTP 429、RATE_LIMIT_CODES 业务码）时
+        降低该接口速率并自动重试，最多 RATE_LIMIT_MAX_RETRIES 次。连接错误、超时与网关错误
+        只由 session 的 urllib3 重试策略处理（见 _new_session），这里不再叠加重试，
+        最终超时仅作为限频信号降低该接口速率。
+
         Args:
             method:    HTTP 方法，"GET" / "POST" / "PUT" 等。
             path:      接口路径（以 "/" 开头则自动拼接 API_BASE_URL）或完整 URL。
@@ -470,24 +1458,69 @@ class Pan123Core:
                 失败: {"code": <0, "message": "错误描述", "data": {API响应} | None}
         """
         url = f"{API_BASE_URL}{path}" if path.startswith("/") else path
-        try:
-            resp = requests.request(
-                method, url,
-                headers=self.headers,
-                json=json_data,
-                params=params,
-                timeout=timeout,
+        endpoint = urlparse(url).path
+        limiter = self.rate_limiter
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            can_retry = attempt < RATE_LIMIT_MAX_RETRIES
+            if limiter:
+                limiter.acquire(endpoint)
+            try:
+                resp = self.session.request(
+                    method, url,
+                    json=json_data,
+                    params=params,
+                    timeout=timeout,
+                )
+            except requests.Timeout as e:
+                # urllib3 已按 HTTP_MAX_RETRIES 重试过，超时仅视为限频信号
+                if limiter:
+                    limiter.on_throttle(endpoint)
+                return make_result(-1, f"请求失败: {e}")
+            except requests.RequestException as e:
+                return make_result(-1, f"请求失败: {e}")
+
+            try:
+                data = resp.json()
+            except ValueError:
+                data = None
+            result = self._handle_response(
+                endpoint, resp.status_code, resp.headers.get("Retry-After", ""), data, can_retry,
             )
-            data = resp.json()
-            api_code = data.get("code", -1)
-            # 123pan 登录成功/退出登录 成功返回 code 200，其余接口成功返回 0
-            if api_code not in (CODE_OK, CODE_LOGIN_OK):
-                return make_result(-3, data.get("message", "未知错误"), data)
-            return make_result(CODE_OK, "ok", data)
-        except requests.RequestException as e:
-            return make_result(-1, f"请求失败: {e}")
-        except json.JSONDecodeError:
+            if result is not None:
+                return result
+        return make_result(-1, "请求失败")
+
+    def _handle_response(
+            self,
+            endpoint: str,
+            status_code: int,
+            retry_after: str,
+            data: Any,
+            can_retry: bool,
+    ) -> Optional[Dict[str, Any]]:
+        """将 API 响应转换为 Result，并向 rate_limiter 反馈限频情况（内部方法）。
+
+        同步与异步客户端共用。返回 None 表示被限频且应重试。
+        """
+        limiter = self.rate_limiter
+        api_code = data.get("code", -1) if isinstance(data, dict) else -1
+
+        if status_code == 429 or api_code in RATE_LIMIT_CODES:
+            if limiter:
+                limiter.on_throttle(endpoint, float(retry_after) if retry_after.isdigit() else 0.0)
+                if can_retry:
+                    return None
+            message = data.get("message", "") if isinstance(data, dict) else ""
+            return make_result(-3, f"请求过于频繁: {message}" if message else "请求过于频繁", data)
+        if limiter:
+            limiter.on_success(endpoint)
+
+        if not isinstance(data, dict):
             return make_result(-2, "响应 JSON 解析错误")
+        # 123pan 登录成功/退出登录 成功返回 code 200，其余接口成功返回 0
+        if api_code not in (CODE_OK, CODE_LOGIN_OK):
+            return make_result(-3, data.get("message", "未知错误"), data)
+        return make_result(CODE_OK, "ok", data)
 
     # ════════════════════════════════════════════════════════════
     #  用户信息
@@ -563,6 +1596,7 @@ class Pan123Core:
         self.authorization = ""
         self._sync_authorization()
         self.cookies = None
+        self.session.cookies.clear()
         # self.save_config_to_file()
         return make_result(CODE_OK, "已登出")
 
@@ -579,6 +1613,7 @@ class Pan123Core:
         self.authorization = ""
         self._sync_authorization()
         self.cookies = None
+        self.session.cookies.clear()
         # self.save_config_to_file()
         return make_result(CODE_OK, "账号信息已清除")
 
@@ -654,13 +1689,23 @@ class Pan123Core:
             parent_id: Optional[int] = None,
             page: int = 1,
             limit: int = FILE_LIST_PAGE_LIMIT,
+            use_cache: bool = True,
+            search: str = "",
+            trashed: bool = False,
     ) -> Dict[str, Any]:
         """获取指定目录的单页文件列表。
 
+        结果会写入 listing_cache，有效期内再次请求同一页直接返回缓存；
+        同时填充 path_index，供 resolve_path() 使用。
+
         Args:
             parent_id: 父目录 FileId，为 None 则使用当前工作目录 cwd_id。
             page:      页码，从 1 开始。
             limit:     单页最大条目数，默认 FILE_LIST_PAGE_LIMIT (100)。
+            use_cache: False = 忽略缓存强制从服务端获取（结果仍会刷新缓存）。
+            search:    服务端按文件名搜索的关键字（SearchData），结果可能包含其它目录下的条目。
+            trashed:   True = 列出回收站（parent_id 通常为 0）。回收站内容随删除 / 恢复不断变化，
+                       且其中的条目不应参与路径解析，因此不读写 listing_cache 与 path_index。
 
         Returns:
             Result 字典::
@@ -677,37 +1722,166 @@ class Pan123Core:
         """
         if parent_id is None:
             parent_id = self.cwd_id
-        params = {
+        cache_key = (int(parent_id), page, limit, search)
+        if use_cache and not trashed:
+            cached = self.listing_cache.get(cache_key)
+            if cached is not None:
+                return make_result(CODE_OK, "ok", {"items": list(cached["items"]), "total": cached["total"]})
+        params = self._list_dir_params(parent_id, page, limit, search, trashed)
+        result = self._request("GET", URL_FILE_LIST, params=params, timeout=TIMEOUT_FILE_LIST)
+        if result["code"] != CODE_OK:
+            return result
+        return self._store_listing(cache_key, result["data"]["data"], search, trashed)
+
+    @staticmethod
+    def _list_dir_params(parent_id: int, page: int, limit: int, search: str, trashed: bool = False) -> Dict[str, Any]:
+        return {
             "driveId": 0,
             "limit": limit,
             "next": 0,
             "orderBy": "file_id",
             "orderDirection": "desc",
             "parentFileId": str(parent_id),
-            "trashed": False,
-            "SearchData": "",
+            "trashed": trashed,
+            "SearchData": search,
             "Page": str(page),
             "OnlyLookAbnormalFile": 0,
         }
-        result = self._request("GET", URL_FILE_LIST, params=params, timeout=TIMEOUT_FILE_LIST)
-        if result["code"] != CODE_OK:
-            return result
-        info = result["data"]["data"]
+
+    def _store_listing(self, cache_key: Tuple, info: Dict[str, Any], search: str, trashed: bool = False) -> Dict[str, Any]:
+        """将列表接口返回的一页转换为 FileEntry，写入 listing_cache 与 path_index（回收站除外），
+        并构造 list_dir() 的返回值。"""
+        items = [FileEntry.from_dict(item, self.keep_raw_fields) for item in info["InfoList"] or []]
+        if not trashed:
+            self.listing_cache.put(cache_key, {"items": items, "total": info["Total"]})
+            # 搜索结果可能来自其它目录，按条目自身的 ParentFileId 建立索引
+            self.path_index.add(items, None if search else cache_key[0])
         return make_result(CODE_OK, "ok", {
-            "items": info["InfoList"],
+            "items": list(items),
             "total": info["Total"],
         })
 
+    def iter_dir(
+            self,
+            parent_id: Optional[int] = None,
+            limit: int = FILE_LIST_PAGE_LIMIT,
+            use_cache: bool = True,
+            search: str = "",
+            trashed: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """逐页获取指定目录内容的生成器。
+
+        翻页速率由 rate_limiter 按服务端的实际限频情况自适应调整。
+
+        每取到一页即 yield 该页的 Result，调用方可以在第一页到达时就开始处理，
+        且内存中只保留当前页。遇到失败时 yield 失败的 Result 后结束。
+
+        Args:
+            parent_id: 父目录 FileId，为 None 则使用当前工作目录。
+            limit:     单页最大条目数。
+            use_cache: 同 list_dir()。
+            search:    同 list_dir()。
+            trashed:   同 list_dir()。
+
+        Yields:
+            与 list_dir() 相同的 Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": {"items": [本页文件信息 dict, ...], "total": int}}
+                失败: {"code": <错误码>, "message": "...", "data": None}
+        """
+        if parent_id is None:
+            parent_id = self.cwd_id
+        page = 1
+        fetched = 0
+        while True:
+            r = self.list_dir(parent_id, page=page, limit=limit, use_cache=use_cache, search=search, trashed=trashed)
+            yield r
+            if r["code"] != CODE_OK:
+                return
+            items = r["data"]["items"]
+            fetched += len(items)
+            if not items or fetched >= r["data"]["total"]:
+                return
+            page += 1
+
+    def search(
+            self,
+            query: str,
+            parent_id: Optional[int] = None,
+            limit: int = FILE_LIST_PAGE_LIMIT,
+    ) -> Iterator[Dict[str, Any]]:
+        """按文件名在服务端搜索的生成器（SearchData 参数），逐页 yield 搜索结果。
+
+        服务端一次请求即可返回匹配项，无需在客户端遍历目录树；搜索范围由服务端决定，
+        结果可能包含 parent_id 以外目录中的条目。结果同样会填充 path_index。
+
+        Args:
+            query:     搜索关键字。
+            parent_id: 搜索起点目录 FileId，为 None 则从根目录搜索。
+            limit:     单页最大条目数。
+
+        Yields:
+            与 iter_dir() 相同的 Result 字典；关键字为空时 yield 一个失败 Result::
+
+                {"code": -1, "message": "搜索关键字不能为空", "data": None}
+        """
+        if not query:
+            yield make_result(-1, "搜索关键字不能为空")
+            return
+        yield from self.iter_dir(0 if parent_id is None else parent_id, limit=limit, search=query)
+
+    def search_cached(self, query: str) -> Dict[str, Any]:
+        """在本地已获取过的目录列表中按文件名搜索（不区分大小写），不发起网络请求。
+
+        可在服务端搜索不可用时作为后备，只能找到此前列出过的条目。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": [文件信息 dict, ...]}
+        """
+        if not query:
+            return make_result(-1, "搜索关键字不能为空")
+        return make_result(CODE_OK, "ok", self.path_index.find(query))
+
+    def path_of(self, item: Dict[str, Any]) -> str:
+        """根据 path_index 与当前工作目录推算条目的完整路径，例如 "/照片/2024/a.jpg"。
+
+        无法确定的上级目录以 "…" 表示，例如 "…/2024/a.jpg"。
+        """
+        known = dict(zip(self.cwd_stack[1:], zip(self.cwd_stack, self.cwd_name_stack)))
+        names = [item["FileName"]]
+        parent_id = item.get("ParentFileId")
+        while parent_id:
+            location = self.path_index.locate(parent_id) or known.get(int(parent_id))
+            if location is None:
+                return "…/" + "/".join(reversed(names))
+            parent_id, name = location
+            names.append(name)
+        return "/" + "/".join(reversed(names))
+
     def list_dir_all(
             self,
             parent_id: Optional[int] = None,
             limit: int = FILE_LIST_PAGE_LIMIT,
+            workers: int = LIST_PAGE_WORKERS,
+            use_cache: bool = True,
+            trashed: bool = False,
     ) -> Dict[str, Any]:
-        """获取指定目录下的全部文件（自动翻页，含限频等待）。
+        """获取指定目录下的全部文件（自动翻页）。
+
+        第一页返回 Total 后即可确定剩余页数，剩余页由 workers 个线程并发获取（仍受 rate_limiter 限速），
+        结果按服务端页序拼接，并按 FileId 去重（翻页期间目录变化可能导致条目在相邻页重复出现）。
+        翻页期间目录变化也可能使条目被跳过，去重无法找回；因此各页 Total 不一致或去重后条目数
+        与 Total 不符时，会忽略缓存重新逐页顺序获取一遍。顺序获取期间目录仍在变化时，结果仍可能
+        不完整。大目录若需逐页处理、控制内存，请直接使用 iter_dir()。
 
         Args:
             parent_id: 父目录 FileId，为 None 则使用当前工作目录。
             limit:     单页最大条目数。
+            workers:   并发获取的线程数，1 表示逐页顺序获取。
+            use_cache: False = 忽略目录列表缓存，直接请求服务端。
+            trashed:   同 list_dir()。
 
         Returns:
             Result 字典::
@@ -724,24 +1898,60 @@ class Pan123Core:
         """
         if parent_id is None:
             parent_id = self.cwd_id
-        page = 1
-        all_items: List[Dict] = []
-        total = -1
-        while total == -1 or len(all_items) < total:
-            r = self.list_dir(parent_id, page=page, limit=limit)
-            if r["code"] != CODE_OK:
-                return r
-            all_items.extend(r["data"]["items"])
-            total = r["data"]["total"]
-            page += 1
-            # 限频：每 RATE_LIMIT_PAGES 页暂停 RATE_LIMIT_INTERVAL 秒
-            if (page - 1) % RATE_LIMIT_PAGES == 0:
-                time.sleep(RATE_LIMIT_INTERVAL)
-        return make_result(CODE_OK, "ok", {"items": all_items, "total": total})
+        if workers <= 1:
+            pages = []
+            for r in self.iter_dir(parent_id, limit, use_cache=use_cache, trashed=trashed):
+                if r["code"] != CODE_OK:
+                    return r
+                pages.append(r["data"])
+            items, _ = self._merge_pages(pages)
+        else:
+            first = self.list_dir(parent_id, page=1, limit=limit, use_cache=use_cache, trashed=trashed)
+            if first["code"] != CODE_OK:
+                return first
+            pages = [first["data"]]
+            # 服务端可能对单页条目数设有上限，以实际返回的条目数计算页数
+            page_size = len(first["data"]["items"]) or limit
+            page_count = -(-first["data"]["total"] // page_size)
+            if page_count > 1:
+                with ThreadPoolExecutor(max_workers=min(workers, page_count - 1)) as pool:
+                    results = list(pool.map(
+                        lambda page: self.list_dir(parent_id, page=page, limit=limit, use_cache=use_cache, trashed=trashed),
+                        range(2, page_count + 1),
+                    ))
+                for r in results:
+                    if r["code"] != CODE_OK:
+                        return r
+                    pages.append(r["data"])
+            items, complete = self._merge_pages(pages)
+            if not complete:
+                # 并发翻页期间目录发生变化，可能漏掉条目，退回逐页顺序获取
+                return self.list_dir_all(parent_id, limit, workers=1, use_cache=False, trashed=trashed)
+        return make_result(CODE_OK, "ok", {"items": items, "total": pages[-1]["total"]})
+
+    @staticmethod
+    def _merge_pages(pages: List[Dict[str, Any]]) -> Tuple[List[Dict], bool]:
+        """按页序拼接各页条目并按 FileId 去重，同步与异步客户端共用。
 
-    def refresh(self) -> Dict[str, Any]:
+        Returns:
+            (条目列表, 是否完整)：各页 Total 一致且去重后条目数等于 Total 时视为完整。
+        """
+        items: List[Dict] = []
+        seen: Set[int] = set()
+        for data in pages:
+            for item in data["items"]:
+                if item["FileId"] not in seen:
+                    seen.add(item["FileId"])
+                    items.append(item)
+        totals = {data["total"] for data in pages}
+        return items, len(totals) == 1 and len(items) == pages[0]["total"]
+
+    def refresh(self, use_cache: bool = True) -> Dict[str, Any]:
         """刷新当前目录：清空 file_list 并重新加载第一页。
 
+        Args:
+            use_cache: False = 忽略目录列表缓存，之后的 load_more() 也从服务端获取。
+
         Returns:
             与 load_more() 相同的 Result 字典。
         """
@@ -749,10 +1959,11 @@ class Pan123Core:
         self.file_total = 0
         self.all_loaded = False
         self._page = 0
+        self._use_cache = use_cache
         return self.load_more()
 
     def load_more(self) -> Dict[str, Any]:
-        """加载当前目录的下一页文件，追加到 file_list。
+        """加载当前目录的下一页文件，追加到 file_list（是否使用缓存取决于上次 refresh()）。
 
         Returns:
             Result 字典::
@@ -769,7 +1980,7 @@ class Pan123Core:
                 失败: {"code": <错误码>, "message": "...", "data": None}
         """
         self._page += 1
-        r = self.list_dir(page=self._page)
+        r = self.list_dir(page=self._page, use_cache=self._use_cache)
         if r["code"] != CODE_OK:
             return r
         self.file_list.extend(r["data"]["items"])
@@ -839,67 +2050,206 @@ class Pan123Core:
         self.cwd_name_stack = []
         return self.refresh()
 
-    # ════════════════════════════════════════════════════════════
-    #  创建目录
-    # ════════════════════════════════════════════════════════════
+    def resolve_path(self, path: str) -> Dict[str, Any]:
+        """将路径解析为 FileId。
 
-    def mkdir(self, name: str) -> Dict[str, Any]:
-        """在当前目录下创建子目录。
+        以 "/" 开头为绝对路径，否则相对于当前工作目录；支持 "." 与 ".."。
+        优先查询 path_index，未命中时使用服务端搜索（SearchData）定位该名称，
+        而不是翻页列出整个目录。
 
         Args:
-            name: 新目录名称，不可为空。
+            path: 例如 "/照片/2024/a.jpg"、"2024"、"../文档"。
 
         Returns:
             Result 字典::
 
-                成功: {"code": 0, "message": "ok", "data": {API 响应}}
-                失败: {"code": -1, "message": "...", "data": ...}
+                成功: {"code": 0, "message": "ok", "data": FileId (int)}
+                失败: {"code": -1, "message": "路径不存在: ..." | "不是文件夹: ...", "data": None}
+                      或 list_dir() 的失败 Result
         """
-        if not name:
-            return make_result(-1, "目录名不能为空")
-        payload = {
-            "driveId": 0,
-            "etag": "",
-            "fileName": name,
-            "parentFileId": self.cwd_id,
-            "size": 0,
-            "type": 1,
-            "duplicate": 1,
-            "NotReuse": True,
-            "event": "newCreateFolder",
-            "operateType": 1,
-        }
-        return self._request("POST", URL_MKDIR, json_data=payload)
+        r = self._resolve_chain(path)
+        if r["code"] != CODE_OK:
+            return r
+        return make_result(CODE_OK, "ok", r["data"][-1]["FileId"])
 
-    # ════════════════════════════════════════════════════════════
-    #  删除 / 恢复
-    # ════════════════════════════════════════════════════════════
+    def stat_path(self, path: str) -> Dict[str, Any]:
+        """获取路径对应条目的信息。
 
-    def trash(self, file_data: Any, delete: bool = True) -> Dict[str, Any]:
-        """删除或恢复文件 / 文件夹。
+        Args:
+            path: 同 resolve_path()。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": {文件信息 dict, "Path": "/a/b/c"}}
+                失败: 同 resolve_path()
+        """
+        r = self._resolve_chain(path)
+        if r["code"] != CODE_OK:
+            return r
+        chain = r["data"]
+        item = dict(chain[-1])
+        item["Path"] = "/" + "/".join(node["FileName"] for node in chain[1:])
+        return make_result(CODE_OK, "ok", item)
+
+    def cd_path(self, path: str) -> Dict[str, Any]:
+        """按路径切换工作目录。
 
         Args:
-            file_data: 文件信息字典（需包含 "FileId" 等字段），
-                       来自 file_list 中的条目或手动构造的 {"FileId": int}。
-            delete:    True = 删除（移入回收站），False = 恢复（从回收站还原）。
+            path: 同 resolve_path()，必须指向文件夹。
 
         Returns:
             Result 字典::
 
-                成功: {"code": 0, "message": "删除成功" | "恢复成功", "data": None}
-                失败: {"code": <错误码>, "message": "...", "data": None}
+                成功: 等同于 refresh() 的返回。
+                失败: 同 resolve_path()，或 {"code": -1, "message": "目标不是文件夹", "data": None}
         """
-        action = "删除" if delete else "恢复"
-        payload = {
+        r = self._resolve_chain(path)
+        if r["code"] != CODE_OK:
+            return r
+        chain = r["data"]
+        if chain[-1]["Type"] != 1:
+            return make_result(-1, "目标不是文件夹")
+        self.cwd_id = chain[-1]["FileId"]
+        self.cwd_stack = [node["FileId"] for node in chain]
+        self.cwd_name_stack = [node["FileName"] for node in chain[1:]]
+        return self.refresh()
+
+    def _resolve_chain(self, path: str) -> Dict[str, Any]:
+        """解析路径，成功时 data 为从根目录到目标的条目列表（第一个元素为根目录）。"""
+        path = path.replace("\\", "/")
+        chain: List[Dict[str, Any]] = [{"FileId": 0, "FileName": "", "Type": 1}]
+        if not path.startswith("/"):
+            chain += [
+                {"FileId": fid, "FileName": name, "Type": 1}
+                for fid, name in zip(self.cwd_stack[1:], self.cwd_name_stack)
+            ]
+        for name in path.split("/"):
+            if name in ("", "."):
+                continue
+            if name == "..":
+                if len(chain) > 1:
+                    chain.pop()
+                continue
+            if chain[-1]["Type"] != 1:
+                return make_result(-1, f"不是文件夹: {chain[-1]['FileName']}")
+            r = self._lookup(chain[-1]["FileId"], name)
+            if r["code"] != CODE_OK:
+                return r
+            if r["data"] is None:
+                return make_result(-1, f"路径不存在: {path}")
+            chain.append(r["data"])
+        return make_result(CODE_OK, "ok", chain)
+
+    def _lookup(self, parent_id: int, name: str) -> Dict[str, Any]:
+        """在指定目录下查找名称，data 为条目或 None（不存在）。"""
+        item = self.path_index.get(parent_id, name)
+        if item is not None:
+            return make_result(CODE_OK, "ok", item)
+        for r in self.search(name, parent_id):
+            if r["code"] != CODE_OK:
+                return r
+            for candidate in r["data"]["items"]:
+                if candidate["FileName"] == name and int(candidate.get("ParentFileId", -1)) == int(parent_id):
+                    return make_result(CODE_OK, "ok", candidate)
+        return make_result(CODE_OK, "ok", None)
+
+    # ════════════════════════════════════════════════════════════
+    #  创建目录
+    # ════════════════════════════════════════════════════════════
+
+    def mkdir(self, name: str, parent_id: Optional[int] = None) -> Dict[str, Any]:
+        """在指定目录（默认当前目录）下创建子目录。
+
+        Args:
+            name:      新目录名称，不可为空。
+            parent_id: 父目录 FileId，为 None 则使用当前工作目录 cwd_id。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": {API 响应}}
+                失败: {"code": -1, "message": "...", "data": ...}
+        """
+        if not name:
+            return make_result(-1, "目录名不能为空")
+        if parent_id is None:
+            parent_id = self.cwd_id
+        r = self._request("POST", URL_MKDIR, json_data=self._mkdir_payload(name, parent_id))
+        self._invalidate_dir(parent_id)
+        return r
+
+    # ════════════════════════════════════════════════════════════
+    #  删除 / 恢复
+    # ════════════════════════════════════════════════════════════
+
+    def trash(self, file_data: Any, delete: bool = True) -> Dict[str, Any]:
+        """删除或恢复文件 / 文件夹。
+
+        Args:
+            file_data: 文件信息字典（需包含 "FileId" 等字段），
+                       来自 file_list 中的条目或手动构造的 {"FileId": int}。
+            delete:    True = 删除（移入回收站），False = 恢复（从回收站还原）。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "删除成功" | "恢复成功", "data": None}
+                失败: {"code": <错误码>, "message": "...", "data": None}
+        """
+        r = self._request("POST", URL_FILE_TRASH, json_data=self._trash_payload(file_data, delete), timeout=TIMEOUT_TRASH)
+        return self._trash_result(r, file_data, delete)
+
+    @staticmethod
+    def _trash_payload(file_data: Any, delete: bool) -> Dict[str, Any]:
+        # FileEntry 不能直接序列化为 JSON，转换为普通字典
+        if isinstance(file_data, list):
+            file_data = [dict(item) for item in file_data]
+        else:
+            file_data = dict(file_data)
+        return {
             "driveId": 0,
             "fileTrashInfoList": file_data,
             "operation": delete,
         }
-        r = self._request("POST", URL_FILE_TRASH, json_data=payload, timeout=TIMEOUT_TRASH)
+
+    def _trash_result(self, r: Dict[str, Any], file_data: Any, delete: bool) -> Dict[str, Any]:
+        self._invalidate_parents(file_data)
+        action = "删除" if delete else "恢复"
         if r["code"] == CODE_OK:
             return make_result(CODE_OK, f"{action}成功")
         return make_result(r["code"], f"{action}失败: {r['message']}")
 
+    @staticmethod
+    def _mkdir_payload(name: str, parent_id: int) -> Dict[str, Any]:
+        return {
+            "driveId": 0,
+            "etag": "",
+            "fileName": name,
+            "parentFileId": parent_id,
+            "size": 0,
+            "type": 1,
+            "duplicate": 1,
+            "NotReuse": True,
+            "event": "newCreateFolder",
+            "operateType": 1,
+        }
+
+    def _invalidate_parents(self, file_data: Any) -> None:
+        """使 file_data（单个或列表）所在目录的列表缓存失效，父目录未知时清空缓存。"""
+        items = file_data if isinstance(file_data, list) else [file_data]
+        parents = {item.get("ParentFileId") for item in items if isinstance(item, Mapping)}
+        if not parents or None in parents:
+            self._invalidate_dir()
+            return
+        for parent_id in parents:
+            self._invalidate_dir(parent_id)
+
+    def _invalidate_dir(self, parent_id: Optional[int] = None) -> None:
+        """目录内容变化后使列表缓存与路径索引失效；parent_id 为 None 时全部失效。"""
+        self.listing_cache.invalidate(parent_id)
+        self.path_index.forget(parent_id)
+
     def trash_by_index(self, index: int) -> Dict[str, Any]:
         """根据 file_list 的 0-based 下标删除文件。
 
@@ -913,12 +2263,109 @@ class Pan123Core:
             return make_result(-1, "无效的文件编号")
         return self.trash(self.file_list[index])
 
+    def trash_many(
+            self,
+            items: List[Any],
+            delete: bool = True,
+            batch_size: int = TRASH_BATCH_SIZE,
+            workers: int = TRASH_WORKERS,
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """批量删除或恢复文件 / 文件夹。
+
+        按 batch_size 分批，每批以一次请求提交整个 fileTrashInfoList，批次由 workers 个线程并发提交
+        （仍受 rate_limiter 限速）。某一批失败不影响其余批次。
+
+        Args:
+            items:       文件信息字典列表（要求同 trash()），也可以直接给出 FileId。
+            delete:      True = 删除（移入回收站），False = 恢复（从回收站还原）。
+            batch_size:  单次请求的最大条目数。
+            workers:     并发提交的线程数。
+            on_progress: 进度回调，每完成一批触发一次 TRASH_PROGRESS 事件::
+
+                             {"type": ..., "done": int, "failed": int, "total": int}
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "已删除 n 项" | "已恢复 n 项", "data": {统计信息}}
+                部分失败: {"code": -1, "message": "部分条目删除失败: ...", "data": {统计信息}}
+
+            统计信息: {"done": int, "failed": [FileId, ...], "errors": [str, ...]}
+        """
+        batches = self._trash_batches(items, batch_size)
+        stats: Dict[str, Any] = {"done": 0, "failed": [], "errors": []}
+        if batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as pool:
+                futures = {pool.submit(self.trash, batch, delete): batch for batch in batches}
+                for future in as_completed(futures):
+                    self._trash_many_progress(stats, futures[future], future.result(), len(items), on_progress)
+        return self._trash_many_result(stats, delete)
+
+    def restore_many(
+            self,
+            items: List[Any],
+            batch_size: int = TRASH_BATCH_SIZE,
+            workers: int = TRASH_WORKERS,
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """批量从回收站恢复文件，参数与返回值同 trash_many()。"""
+        return self.trash_many(items, delete=False, batch_size=batch_size, workers=workers, on_progress=on_progress)
+
+    def trash_by_indices(self, indices: List[int]) -> Dict[str, Any]:
+        """根据 file_list 的 0-based 下标列表批量删除文件。
+
+        Returns:
+            与 trash_many() 相同的 Result 字典。
+        """
+        for i in indices:
+            if not (0 <= i < len(self.file_list)):
+                return make_result(-1, f"无效的文件编号: {i + 1}")
+        return self.trash_many([self.file_list[i] for i in indices])
+
+    @staticmethod
+    def _trash_batches(items: List[Any], batch_size: int) -> List[List[Dict]]:
+        items = [item if isinstance(item, Mapping) else {"FileId": item} for item in items]
+        size = max(1, batch_size)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    @staticmethod
+    def _trash_many_progress(
+            stats: Dict[str, Any],
+            batch: List[Dict],
+            r: Dict[str, Any],
+            total: int,
+            on_progress: ProgressCallback,
+    ) -> None:
+        if r["code"] == CODE_OK:
+            stats["done"] += len(batch)
+        else:
+            stats["failed"].extend(item.get("FileId") for item in batch)
+            stats["errors"].append(r["message"])
+        if on_progress:
+            on_progress({
+                "type": Pan123EventType.TRASH_PROGRESS,
+                "done": stats["done"],
+                "failed": len(stats["failed"]),
+                "total": total,
+            })
+
+    @staticmethod
+    def _trash_many_result(stats: Dict[str, Any], delete: bool) -> Dict[str, Any]:
+        action = "删除" if delete else "恢复"
+        if stats["failed"]:
+            return make_result(-1, f"部分条目{action}失败: {'; '.join(stats['errors'])}", stats)
+        return make_result(CODE_OK, f"已{action} {stats['done']} 项", stats)
+
     # ════════════════════════════════════════════════════════════
     #  回收站
     # ════════════════════════════════════════════════════════════
 
-    def list_recycle(self) -> Dict[str, Any]:
-        """获取回收站中的文件列表。
+    def list_recycle(self, workers: int = LIST_PAGE_WORKERS) -> Dict[str, Any]:
+        """获取回收站中的全部文件（自动翻页，同 list_dir_all() 并发获取剩余页）。
+
+        Args:
+            workers: 并发获取的线程数，1 表示逐页顺序获取。
 
         Returns:
             Result 字典::
@@ -926,20 +2373,77 @@ class Pan123Core:
                 成功: {"code": 0, "message": "ok", "data": [文件信息 dict, ...]}
                 失败: {"code": <错误码>, "message": "...", "data": None}
         """
-        params = {
-            "driveId": 0,
-            "limit": FILE_LIST_PAGE_LIMIT,
-            "next": 0,
-            "orderBy": "fileId",
-            "orderDirection": "desc",
-            "parentFileId": 0,
-            "trashed": True,
-            "Page": 1,
-        }
-        r = self._request("GET", URL_FILE_LIST, params=params)
+        r = self.list_dir_all(0, workers=workers, trashed=True)
         if r["code"] != CODE_OK:
             return r
-        return make_result(CODE_OK, "ok", r["data"]["data"]["InfoList"])
+        return make_result(CODE_OK, "ok", r["data"]["items"])
+
+    def iter_recycle(self, limit: int = FILE_LIST_PAGE_LIMIT) -> Iterator[Dict[str, Any]]:
+        """逐页获取回收站内容的生成器，Yields 同 iter_dir()，内存中只保留当前页。"""
+        yield from self.iter_dir(0, limit=limit, trashed=True)
+
+    @staticmethod
+    def filter_recycle(items: List[Dict], pattern: str = "", older_than: float = 0) -> List[Dict]:
+        """按文件名与时间筛选回收站条目。
+
+        Args:
+            items:      回收站条目列表。
+            pattern:    文件名通配符（fnmatch，不区分大小写），如 "*.tmp"，为空则不按名称筛选。
+            older_than: 只保留 UpdateAt 早于若干天之前的条目，0 表示不按时间筛选；
+                        UpdateAt 无法解析的条目在按时间筛选时被排除。
+
+        Returns:
+            匹配的条目列表。
+        """
+        pattern = pattern.lower()
+        cutoff = time.time() - older_than * 86400
+        matched = []
+        for item in items:
+            if pattern and not fnmatch.fnmatchcase(item["FileName"].lower(), pattern):
+                continue
+            if older_than > 0:
+                updated = _parse_update_time(item.get("UpdateAt"))
+                if updated is None or updated > cutoff:
+                    continue
+            matched.append(item)
+        return matched
+
+    def purge_recycle(
+            self,
+            pattern: str = "",
+            older_than: float = 0,
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """清理回收站中匹配的条目（默认全部）。
+
+        先完整列出回收站（翻页期间不做修改，避免条目在页间移动而被漏掉），
+        按 filter_recycle() 筛选后交给 trash_many() 分批并发提交。
+
+        Returns:
+            与 trash_many() 相同的 Result 字典，列出回收站失败时返回原始错误。
+        """
+        return self._recycle_bulk(pattern, older_than, True, on_progress)
+
+    def restore_recycle(
+            self,
+            pattern: str = "",
+            older_than: float = 0,
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """恢复回收站中匹配的条目（默认全部），流程同 purge_recycle()。"""
+        return self._recycle_bulk(pattern, older_than, False, on_progress)
+
+    def _recycle_bulk(
+            self,
+            pattern: str,
+            older_than: float,
+            delete: bool,
+            on_progress: ProgressCallback,
+    ) -> Dict[str, Any]:
+        r = self.list_recycle()
+        if r["code"] != CODE_OK:
+            return r
+        return self.trash_many(self.filter_recycle(r["data"], pattern, older_than), delete, on_progress=on_progress)
 
     def restore(self, file_id: int) -> Dict[str, Any]:
         """从回收站恢复指定文件。
@@ -984,7 +2488,14 @@ class Pan123Core:
         """
         if not file_ids:
             return make_result(-1, "未选择文件")
-        payload = {
+        r = self._request("POST", URL_SHARE_CREATE, json_data=self._share_payload(file_ids, share_pwd, expiration))
+        if r["code"] != CODE_OK:
+            return r
+        return self._share_result(r["data"], share_pwd)
+
+    @staticmethod
+    def _share_payload(file_ids: List[int], share_pwd: str, expiration: str) -> Dict[str, Any]:
+        return {
             "driveId": 0,
             "expiration": expiration,
             "fileIdList": ",".join(str(fid) for fid in file_ids),
@@ -992,10 +2503,10 @@ class Pan123Core:
             "sharePwd": share_pwd,
             "event": "shareCreate",
         }
-        r = self._request("POST", URL_SHARE_CREATE, json_data=payload)
-        if r["code"] != CODE_OK:
-            return r
-        key = r["data"]["data"]["ShareKey"]
+
+    @staticmethod
+    def _share_result(data: Dict[str, Any], share_pwd: str) -> Dict[str, Any]:
+        key = data["data"]["ShareKey"]
         share_url = SHARE_URL_TEMPLATE.format(base=API_BASE_URL, key=key)
         return make_result(CODE_OK, "分享创建成功", {
             "share_url": share_url,
@@ -1041,38 +2552,65 @@ class Pan123Core:
         item = self.file_list[index]
         return self.get_item_download_url(item)
 
-    def get_item_download_url(self, item: Dict) -> Dict[str, Any]:
+    def get_item_download_url(self, item: Dict, use_cache: bool = True) -> Dict[str, Any]:
         """获取单个文件或文件夹的真实下载链接。
+
+        文件的直链按 (FileId, Etag) 缓存在 link_cache 中，直到签名过期前不再重复请求。
+
         Args:
             item: 文件信息字典，文件夹（Type = 1）需包含 "FileId"
                     文件（Type = 0）需包含 "FileId", "Etag", "S3KeyFlag", "Type", "FileName", "Size"。可以来自 file_list 中的条目或手动构造的 dict。
+            use_cache: False = 忽略缓存重新获取（结果仍会写入缓存）。
 
         Returns:
             Result 字典::
                 成功: {"code": 0, "message": "ok", "data": {"url": "https://..."}}
                 失败: {"code": -1, "message": "...", "data": None}
         """
-        # 文件夹走批量下载接口，文件走单文件接口
-        if item["Type"] == 1:
-            api_path = URL_BATCH_DOWNLOAD
-            payload = {"fileIdList": [{"fileId": int(item["FileId"])}]}
-        else:
-            api_path = URL_DOWNLOAD_INFO
-            payload = {
-                "driveId": 0,
-                "etag": item["Etag"],
-                "fileId": item["FileId"],
-                "s3keyFlag": item["S3KeyFlag"],
-                "type": item["Type"],
-                "fileName": item["FileName"],
-                "size": item["Size"],
-            }
+        if item["Type"] != 1 and use_cache:
+            url = self.link_cache.get(item)
+            if url:
+                return make_result(CODE_OK, "ok", {"url": url})
+        r = self._resolve_download_url(item)
+        if r["code"] == CODE_OK and item["Type"] != 1:
+            self.link_cache.put(item, r["data"]["url"])
+        return r
+
+    def get_item_download_urls(
+            self,
+            items: List[Dict],
+            workers: int = LINK_RESOLVE_WORKERS,
+            use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """并发获取多个文件的真实下载链接。
+
+        Args:
+            items:     文件信息字典列表，要求同 get_item_download_url()。
+            workers:   并发线程数（仍受 rate_limiter 限速）。
+            use_cache: 同 get_item_download_url()。
+
+        Returns:
+            Result 字典，data 为与 items 一一对应的 get_item_download_url() 结果列表::
 
+                {"code": 0, "message": "已获取 n/m 个直链", "data": [Result, ...]}
+        """
+        if not items:
+            return make_result(CODE_OK, "已获取 0/0 个直链", [])
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as pool:
+            results = list(pool.map(lambda item: self.get_item_download_url(item, use_cache), items))
+        ok = sum(1 for r in results if r["code"] == CODE_OK)
+        return make_result(CODE_OK, f"已获取 {ok}/{len(items)} 个直链", results)
+
+    def _resolve_download_url(self, item: Dict) -> Dict[str, Any]:
+        """请求 download_info 接口并跟随跳转得到真实下载链接（不使用缓存）。"""
+        api_path, payload = self._download_info_request(item)
         r = self._request("POST", api_path, json_data=payload)
         if r["code"] != CODE_OK:
             return r
 
-        download_url = r["data"]["data"]["DownloadUrl"]
+        download_url = (r["data"].get("data") or {}).get("DownloadUrl")
+        if not download_url:
+            return make_result(-1, "获取下载地址失败: 响应中缺少 DownloadUrl", r["data"])
 
         # 跟随重定向获取真实下载链接
         try:
@@ -1081,19 +2619,37 @@ class Pan123Core:
             # 关闭 SSL 验证以避免下载链接获取失败
             # 仅在获取下载链接时关闭验证
             requests.packages.urllib3.disable_warnings()
-            resp = requests.get(download_url, allow_redirects=False, timeout=TIMEOUT_DEFAULT, verify=False)
-            if resp.status_code == 302:
-                location = resp.headers.get("Location")
-                if location:
-                    return make_result(CODE_OK, "ok", {"url": location})
-            # 尝试从 HTML 响应中提取 href
-            match = re.search(r"href='(https?://[^']+)'", resp.text)
-            if match:
-                return make_result(CODE_OK, "ok", {"url": match.group(1)})
-            return make_result(-1, "无法解析真实下载链接")
+            resp = self.transfer_session.get(download_url, allow_redirects=False, timeout=TIMEOUT_DEFAULT, verify=False)
+            return self._parse_download_redirect(resp.status_code, resp.headers.get("Location"), resp.text)
         except requests.RequestException as e:
             return make_result(-1, f"获取真实下载链接失败: {e}")
 
+    @staticmethod
+    def _download_info_request(item: Dict) -> Tuple[str, Dict[str, Any]]:
+        """返回获取下载地址所用的 (接口路径, 请求体)：文件夹走批量下载接口，文件走单文件接口。"""
+        if item["Type"] == 1:
+            return URL_BATCH_DOWNLOAD, {"fileIdList": [{"fileId": int(item["FileId"])}]}
+        return URL_DOWNLOAD_INFO, {
+            "driveId": 0,
+            "etag": item["Etag"],
+            "fileId": item["FileId"],
+            "s3keyFlag": item["S3KeyFlag"],
+            "type": item["Type"],
+            "fileName": item["FileName"],
+            "size": item["Size"],
+        }
+
+    @staticmethod
+    def _parse_download_redirect(status_code: int, location: Optional[str], text: str) -> Dict[str, Any]:
+        """从下载地址的响应（302 跳转或 HTML 页面）中解析真实下载链接。"""
+        if status_code == 302 and location:
+            return make_result(CODE_OK, "ok", {"url": location})
+        # 尝试从 HTML 响应中提取 href
+        match = re.search(r"href='(https?://[^']+)'", text)
+        if match:
+            return make_result(CODE_OK, "ok", {"url": match.group(1)})
+        return make_result(-1, "无法解析真实下载链接")
+
     # 文件交互，方法已移至 Pan123Tool
     # def download_file(
     #         self,
@@ -1240,10 +2796,14 @@ class Pan123Core:
             file_path: str,
             duplicate: int = 0,
             on_progress: ProgressCallback = None,
+            parent_id: Optional[int] = None,
+            md5: str = "",
     ) -> Dict[str, Any]:
-        """上传本地文件到当前目录。
+        """上传本地文件到指定目录（默认当前目录）。
 
-        支持秒传（MD5 复用）和分块上传。
+        支持秒传（MD5 复用）和分块上传。启用 upload_journal 时，分块上传会话及已确认的分块
+        会被记录，中断后再次上传同一文件（路径、大小、修改时间、MD5、目标目录均一致）
+        将跳过已完成的分块；服务端会话失效时自动重新发起上传。
 
         Args:
             file_path:   本地文件路径。
@@ -1253,6 +2813,8 @@ class Pan123Core:
                          2 = 保留两者。
             on_progress: 上传进度回调函数，签名:
                          (uploaded_bytes: int, total_bytes: int) -> None
+            parent_id:   目标目录 FileId，为 None 则使用当前工作目录 cwd_id。
+            md5:         已知的文件 MD5，提供时跳过 MD5 计算。
 
         Returns:
             Result 字典::
@@ -1269,35 +2831,68 @@ class Pan123Core:
             return make_result(-1, "暂不支持文件夹上传")
 
         file_name = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path)
+        if parent_id is None:
+            parent_id = self.cwd_id
 
         try:
-            md5 = calc_file_md5(file_path)
+            st = os.stat(file_path)
+            if not md5:
+                md5 = self.hash_cache.file_md5(file_path, st) if self.hash_cache else calc_file_md5(file_path)
         except IOError as e:
             return make_result(-1, f"读取文件失败: {e}")
-
-        payload = {
-            "driveId": 0,
-            "etag": md5,
-            "fileName": file_name,
-            "parentFileId": self.cwd_id,
-            "size": file_size,
-            "type": 0,
-            "duplicate": duplicate,
-        }
+        file_size = st.st_size
+
+        # 续传未完成的分块上传会话
+        journal_key = ""
+        if self.upload_journal is not None:
+            journal_key = UploadJournal.make_key(file_path, file_size, st.st_mtime_ns, md5, parent_id)
+            session = self.upload_journal.get(journal_key)
+            if session:
+                r = self._upload_chunks(
+                    file_path,
+                    bucket=session["Bucket"],
+                    storage_node=session["StorageNode"],
+                    key=session["Key"],
+                    upload_id=session["UploadId"],
+                    file_id=session["FileId"],
+                    on_progress=on_progress,
+                    done_parts=set(session["parts"]),
+                    journal_key=journal_key,
+                )
+                # 仅在服务端明确表示会话已不存在时丢弃记录并重新上传；
+                # 限频、Token 失效、网络错误等则保留记录等待下次续传
+                if r["code"] != CODE_UPLOAD_SESSION_GONE:
+                    self._invalidate_dir(parent_id)
+                    return r
+                self.upload_journal.remove(journal_key)
+
+        payload = self._upload_request_payload(md5, file_name, parent_id, file_size, duplicate)
         r = self._request("POST", URL_UPLOAD_REQUEST, json_data=payload)
         if r["code"] != CODE_OK:
-            # 特殊处理同名冲突
-            if r.get("data") and r["data"].get("code") == CODE_DUPLICATE_FILE:
-                return make_result(CODE_DUPLICATE_FILE, "同名文件已存在，请指定 duplicate 参数")
-            return r
+            return self._upload_request_error(r)
 
         resp_data = r["data"]["data"]
+        # 文件记录已在服务端创建，目录列表随之变化
+        self._invalidate_dir(parent_id)
         if resp_data.get("Reuse", False):
             return make_result(CODE_OK, "秒传成功（MD5 复用）", {"reuse": True})
 
         # 需要分块上传
-        return self._upload_chunks(
+        if journal_key:
+            self.upload_journal.put(journal_key, {
+                "path": os.path.abspath(file_path),
+                "size": file_size,
+                "mtime_ns": st.st_mtime_ns,
+                "md5": md5,
+                "parentFileId": parent_id,
+                "fileName": file_name,
+                "Bucket": resp_data["Bucket"],
+                "StorageNode": resp_data["StorageNode"],
+                "Key": resp_data["Key"],
+                "UploadId": resp_data["UploadId"],
+                "FileId": resp_data["FileId"],
+            })
+        r = self._upload_chunks(
             file_path,
             bucket=resp_data["Bucket"],
             storage_node=resp_data["StorageNode"],
@@ -1305,7 +2900,29 @@ class Pan123Core:
             upload_id=resp_data["UploadId"],
             file_id=resp_data["FileId"],
             on_progress=on_progress,
+            journal_key=journal_key,
         )
+        self._invalidate_dir(parent_id)
+        return r
+
+    @staticmethod
+    def _upload_request_payload(md5: str, file_name: str, parent_id: int, size: int, duplicate: int) -> Dict[str, Any]:
+        return {
+            "driveId": 0,
+            "etag": md5,
+            "fileName": file_name,
+            "parentFileId": parent_id,
+            "size": size,
+            "type": 0,
+            "duplicate": duplicate,
+        }
+
+    @staticmethod
+    def _upload_request_error(r: Dict[str, Any]) -> Dict[str, Any]:
+        # 特殊处理同名冲突
+        if r.get("data") and r["data"].get("code") == CODE_DUPLICATE_FILE:
+            return make_result(CODE_DUPLICATE_FILE, "同名文件已存在，请指定 duplicate 参数")
+        return r
 
     def _upload_chunks(
             self,
@@ -1317,10 +2934,13 @@ class Pan123Core:
             upload_id: str,
             file_id: str,
             on_progress: ProgressCallback = None,
+            done_parts: Optional[Set[int]] = None,
+            journal_key: str = "",
     ) -> Dict[str, Any]:
         """执行 S3 分块上传流程（内部方法）。
 
-        流程: 循环读取文件分块 → 获取预签名 URL → PUT 上传 →
+        流程: 批量获取预签名 URL（每批 UPLOAD_PRESIGN_BATCH 个，用完再取）→
+              线程池并发 PUT 上传（最多 upload_concurrency 个分块同时在途）→
               合并分块 → 确认上传完成。
 
         Args:
@@ -1330,49 +2950,69 @@ class Pan123Core:
             key:          S3 对象 Key。
             upload_id:    S3 分块上传 ID。
             file_id:      123pan 文件 ID。
-            on_progress:  上传进度回调，签名:
+            on_progress:  上传进度回调，uploaded 只统计从第 1 块起连续完成的分块，签名:
                           (uploaded_bytes: int, total_bytes: int) -> None
+            done_parts:   续传时服务端已确认的分块号，这些分块不再上传。
+            journal_key:  上传会话记录键，非空时每完成一个分块即写入 upload_journal，
+                          全部完成后删除记录。
 
         Returns:
             Result 字典::
 
                 成功: {"code": 0, "message": "上传完成", "data": {"reuse": False}}
+                会话失效: {"code": CODE_UPLOAD_SESSION_GONE, "message": "...", "data": None}
                 失败: {"code": -1, "message": "...", "data": None}
         """
-        total_size = os.path.getsize(file_path)
-        uploaded = 0
-        part_number = 1
-
         try:
-            with open(file_path, "rb") as f:
-                while True:
-                    chunk = f.read(UPLOAD_CHUNK_SIZE)
-                    if not chunk:
-                        break
+            total_size = os.path.getsize(file_path)
+        except OSError as e:
+            return make_result(-1, f"读取文件失败: {e}")
+        part_count = -(-total_size // UPLOAD_CHUNK_SIZE)
 
-                    # 步骤 1: 获取分块预签名上传 URL
-                    url_payload = {
-                        "bucket": bucket,
-                        "key": key,
-                        "partNumberEnd": part_number + 1,
-                        "partNumberStart": part_number,
-                        "uploadId": upload_id,
-                        "StorageNode": storage_node,
-                    }
-                    r = self._request("POST", URL_UPLOAD_PARTS, json_data=url_payload)
-                    if r["code"] != CODE_OK:
-                        return make_result(-1, f"获取上传 URL 失败: {r['message']}")
-                    upload_url = r["data"]["data"]["presignedUrls"][str(part_number)]
-
-                    # 步骤 2: PUT 上传分块数据
-                    try:
-                        resp = requests.put(upload_url, data=chunk, timeout=TIMEOUT_UPLOAD_CHUNK)
-                        if resp.status_code not in (200, 201):
-                            return make_result(-1, f"分块上传失败，HTTP {resp.status_code}")
-                    except requests.RequestException as e:
-                        return make_result(-1, f"分块上传请求失败: {e}")
-
-                    uploaded += len(chunk)
+        done_parts = done_parts or set()
+        urls: Dict[int, str] = {}
+        finished: Dict[int, int] = {
+            n: min(UPLOAD_CHUNK_SIZE, total_size - (n - 1) * UPLOAD_CHUNK_SIZE)
+            for n in done_parts if 1 <= n <= part_count
+        }
+        in_flight: Dict[Future, int] = {}
+        next_part = 1
+        contiguous = 1
+        uploaded = 0
+        error: Optional[Dict[str, Any]] = None
+
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as pool:
+            while (next_part <= part_count or in_flight) and error is None:
+                # 补足在途分块，URL 用完时批量获取下一批
+                while next_part <= part_count and len(in_flight) < self.upload_concurrency:
+                    if next_part in done_parts:
+                        next_part += 1
+                        continue
+                    if next_part not in urls:
+                        batch_end = min(next_part + UPLOAD_PRESIGN_BATCH, part_count + 1)
+                        r = self._presign_parts(bucket, storage_node, key, upload_id, next_part, batch_end)
+                        if r["code"] != CODE_OK:
+                            error = make_result(min(r["code"], -1), f"获取上传 URL 失败: {r['message']}")
+                            break
+                        urls.update(r["data"])
+                    future = pool.submit(self._upload_part, file_path, next_part, urls.pop(next_part))
+                    in_flight[future] = next_part
+                    next_part += 1
+                if in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        part_number = in_flight.pop(future)
+                        r = future.result()
+                        if r["code"] != CODE_OK:
+                            error = error or r
+                            continue
+                        finished[part_number] = r["data"]["size"]
+                        if journal_key:
+                            self.upload_journal.mark_part(journal_key, part_number)
+                # 按分块顺序累计进度（续传时此前已完成的分块也一并计入）
+                while contiguous in finished:
+                    uploaded += finished.pop(contiguous)
+                    contiguous += 1
                     if on_progress:
                         on_progress({
                             "type": Pan123EventType.UPLOAD_PROGRESS,
@@ -1380,26 +3020,102 @@ class Pan123Core:
                             "total": total_size,
                             "percent": uploaded / total_size * 100,
                         })
-                    part_number += 1
-
-            # 步骤 3: 通知服务端合并所有分块
-            merge_payload = {
-                "bucket": bucket,
-                "key": key,
-                "uploadId": upload_id,
-                "StorageNode": storage_node,
-            }
-            self._request("POST", URL_UPLOAD_COMPLETE_S3, json_data=merge_payload, timeout=TIMEOUT_TRASH)
-            time.sleep(S3_MERGE_DELAY)
 
-            # 步骤 4: 确认上传完成
-            r = self._request("POST", URL_UPLOAD_COMPLETE, json_data={"fileId": file_id})
-            if r["code"] == CODE_OK:
-                return make_result(CODE_OK, "上传完成", {"reuse": False})
-            return make_result(-1, f"上传确认失败: {r['message']}")
+            # 出错后仍有分块在途：等待其结束，服务端已确认的分块记入续传记录，续传时不再重传
+            for future in as_completed(in_flight):
+                if journal_key and future.result()["code"] == CODE_OK:
+                    self.upload_journal.mark_part(journal_key, in_flight[future])
+
+        if error is not None:
+            return error
+
+        # 通知服务端合并所有分块
+        merge_payload = {
+            "bucket": bucket,
+            "key": key,
+            "uploadId": upload_id,
+            "StorageNode": storage_node,
+        }
+        self._request("POST", URL_UPLOAD_COMPLETE_S3, json_data=merge_payload, timeout=TIMEOUT_TRASH)
+        time.sleep(S3_MERGE_DELAY)
+
+        # 确认上传完成
+        r = self._request("POST", URL_UPLOAD_COMPLETE, json_data={"fileId": file_id})
+        if r["code"] == CODE_OK:
+            if journal_key:
+                self.upload_journal.remove(journal_key)
+            return make_result(CODE_OK, "上传完成", {"reuse": False})
+        return make_result(-1, f"上传确认失败: {r['message']}")
+
+    def _presign_parts(
+            self,
+            bucket: str,
+            storage_node: str,
+            key: str,
+            upload_id: str,
+            start: int,
+            end: int,
+    ) -> Dict[str, Any]:
+        """批量获取分块 [start, end) 的预签名上传 URL（内部方法）。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": {分块号 int: URL str}}
+                失败: {"code": <错误码>, "message": "...", "data": ...}
+        """
+        payload = {
+            "bucket": bucket,
+            "key": key,
+            "partNumberEnd": end,
+            "partNumberStart": start,
+            "uploadId": upload_id,
+            "StorageNode": storage_node,
+        }
+        return self._presign_result(self._request("POST", URL_UPLOAD_PARTS, json_data=payload), start, end)
+
+    @staticmethod
+    def _presign_result(r: Dict[str, Any], start: int, end: int) -> Dict[str, Any]:
+        """将预签名接口的响应转换为 {分块号: URL}，同步与异步客户端共用。"""
+        if r["code"] != CODE_OK:
+            if "NoSuchUpload" in r["message"]:
+                return make_result(CODE_UPLOAD_SESSION_GONE, r["message"], r.get("data"))
+            return r
+        presigned = r["data"]["data"]["presignedUrls"]
+        try:
+            return make_result(CODE_OK, "ok", {n: presigned[str(n)] for n in range(start, end)})
+        except KeyError as e:
+            return make_result(-1, f"缺少分块 {e} 的预签名 URL")
+
+    def _upload_part(self, file_path: str, part_number: int, upload_url: str) -> Dict[str, Any]:
+        """读取第 part_number 块数据并 PUT 到预签名 URL（在线程池中执行）。
 
+        分块读入 _part_buffers 中的复用缓冲区，以 memoryview 作为请求体发送，不产生额外拷贝。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": {"part": int, "size": int}}
+                会话失效: {"code": CODE_UPLOAD_SESSION_GONE, "message": "...", "data": None}
+                失败: {"code": -1, "message": "...", "data": None}
+        """
+        try:
+            buf, chunk = self._part_buffers.read_part(file_path, part_number)
         except IOError as e:
             return make_result(-1, f"读取文件失败: {e}")
+        size = len(chunk)
+        try:
+            resp = self.transfer_session.put(upload_url, data=chunk, timeout=TIMEOUT_UPLOAD_CHUNK)
+            # S3 对已中止 / 已过期的 UploadId 返回 404 NoSuchUpload
+            if resp.status_code == 404 and "NoSuchUpload" in resp.text:
+                return make_result(CODE_UPLOAD_SESSION_GONE, f"分块 {part_number} 上传失败: 上传会话已失效")
+            if resp.status_code not in (200, 201):
+                return make_result(-1, f"分块 {part_number} 上传失败，HTTP {resp.status_code}")
+        except requests.RequestException as e:
+            return make_result(-1, f"分块 {part_number} 上传请求失败: {e}")
+        finally:
+            self._part_buffers.release(buf)
+        return make_result(CODE_OK, "ok", {"part": part_number, "size": size})
 
     # ════════════════════════════════════════════════════════════
     #  协议切换
@@ -1435,14 +3151,47 @@ class Pan123Tool:
     Args:
         core: Pan123Core 实例，负责 API 请求和状态管理。
         config_file: 配置文件路径，默认为 "123pan_config.json"，用于保存和加载账号信息、Token 及协议设置。
+        download_segments: 分段下载的并发连接数，1 表示始终单连接下载。应不大于 core.pool_size。
+        min_segment_size: 每段的最小字节数，文件小于 2 段时退回单连接下载。
+        resume: 是否启用断点续传。启用后下载失败时保留 ".123pan" 临时文件及续传记录，
+                再次下载同一文件（FileId / Etag / Size 一致）时从已完成位置继续。
+                小于 2 × min_segment_size 的文件不做 Range 探测，直接单连接下载且不续传。
+        download_retries: download_item 下载失败后重新获取直链并续传的次数。
+        link_workers: 文件夹下载时解析直链的并发线程数。
+        download_workers: 文件夹下载时同时下载的文件数（每个文件另有 download_segments 个连接）。
+        rate_limit: 全局下载限速（字节/秒），所有文件和分段共享，0 表示不限速。
+        verify: 是否在下载时边写边计算 MD5，并在重命名前与 Etag 比对；不一致时返回 CODE_CHECKSUM_MISMATCH。
 
     :note
         Pan123Tool 主要负责文件下载、上传、目录操作等依赖文件系统的功能，而 Pan123Core 负责 API 请求、认证和状态管理。
     """
 
-    def __init__(self, core: Pan123Core, config_file: str = "123pan_config.json"):
+    def __init__(
+            self,
+            core: Pan123Core,
+            config_file: str = "123pan_config.json",
+            download_segments: int = DOWNLOAD_SEGMENTS,
+            min_segment_size: int = DOWNLOAD_MIN_SEGMENT_SIZE,
+            resume: bool = True,
+            download_retries: int = DOWNLOAD_RETRIES,
+            link_workers: int = DOWNLOAD_LINK_WORKERS,
+            download_workers: int = DOWNLOAD_FILE_WORKERS,
+            rate_limit: int = 0,
+            verify: bool = True,
+    ):
         self.core = core
         self.config_file = config_file
+        self.download_segments = max(1, download_segments)
+        self.min_segment_size = max(1, min_segment_size)
+        self.resume = resume
+        self.download_retries = max(0, download_retries)
+        self.link_workers = max(1, link_workers)
+        self.download_workers = max(1, download_workers)
+        self.rate_limiter: Optional[TokenBucket] = (
+            TokenBucket(rate_limit, capacity=rate_limit) if rate_limit > 0 else None
+        )
+        self.verify = verify
+        self._journal_lock = threading.Lock()
 
     def load_config_from_file(self) -> Dict[str, Any]:
         """从配置文件加载账号信息、Token 及协议设置。
@@ -1549,13 +3298,39 @@ class Pan123Tool:
         if item["Type"] == 1:
             return self.download_directory(item, save_dir, on_progress, overwrite, skip_existing)
 
-        # 获取下载链接
-        r = self.core.get_item_download_url(item)
-        if r["code"] != CODE_OK:
-            return r
-        url = r["data"]["url"]
-        file_name = item["FileName"]
-        return self.download_url(url, file_name, save_dir, on_progress, overwrite, skip_existing)
+        return self._download_with_retry(item, save_dir, on_progress, overwrite, skip_existing)
+
+    def _download_with_retry(
+            self,
+            item: Dict,
+            save_dir: str,
+            on_progress: ProgressCallback,
+            overwrite: bool,
+            skip_existing: bool,
+            url: str = "",
+    ) -> Dict[str, Any]:
+        """下载单个文件，失败后重新获取直链重试（由断点续传记录从已完成位置继续）。
+
+        Args:
+            url: 已解析好的直链，为空则先调用 get_item_download_url() 获取。
+        """
+        r = make_result(-1, "下载失败")
+        for attempt in range(self.download_retries + 1):
+            if attempt:
+                time.sleep(HTTP_RETRY_BACKOFF * (2 ** (attempt - 1)))
+            if not url:
+                # 重试时直链可能已失效，不使用缓存
+                r = self.core.get_item_download_url(item, use_cache=not attempt)
+                if r["code"] != CODE_OK:
+                    continue
+                url = r["data"]["url"]
+            r = self.download_url(url, item["FileName"], save_dir, on_progress, overwrite, skip_existing, item=item)
+            if r["code"] >= 0:
+                return r
+            # 直链有时效且可能中途失效，下次重试重新获取
+            self.core.link_cache.discard(item)
+            url = ""
+        return r
 
     def download_url(
             self,
@@ -1565,23 +3340,35 @@ class Pan123Tool:
             on_progress: ProgressCallback = None,
             overwrite: bool = False,
             skip_existing: bool = False,
+            item: Optional[Dict] = None,
     ) -> Dict[str, Any]:
         """根据下载链接下载文件到本地，支持进度回调和冲突处理。
 
+        服务端支持 Range 且文件足够大时，按 download_segments 将文件切分为多段并发下载，
+        各段直接写入预分配的 ".123pan" 临时文件的对应偏移；否则退回单连接流式下载。
+
+        启用 resume 且提供 item 时，下载进度记录在 ".123pan.json" 续传记录中（以 FileId / Etag / Size
+        标识文件，与直链无关），失败时保留临时文件，下次使用新直链从已完成位置继续。
+
+        启用 verify 且 item 的 Etag 为 MD5 时，下载过程中增量计算 MD5，重命名前与 Etag 比对；
+        不一致时删除临时文件及续传记录（数据已损坏，不可续传）。
+
         Args:
             url:           真实下载链接。
             file_name:     保存的文件名（不含路径）。
             save_dir:      本地保存目录路径，不存在会自动创建。
-            on_progress:   下载进度回调函数，签名:
+            on_progress:   下载进度回调函数，分段下载时 downloaded 为各段字节数之和，签名:
                            (downloaded_bytes: int, total_bytes: int, speed_bps: float) -> None
             overwrite:     True = 覆盖已存在的同名文件。
             skip_existing: True = 跳过已存在的同名文件。
+            item:          文件信息字典（需包含 "FileId"、"Etag"、"Size"），用于断点续传，可为 None。
 
         Returns:
             Result 字典::
                 成功: {"code": 0, "message": "下载完成", "data": {"path": "本地文件路径"}}
                 冲突: {"code": 1, "message": "文件已存在", "data": {"path": "...", "conflict": True}}
                 跳过: {"code": 0, "message": "文件已存在，已跳过", "data": {"path": "..."}}
+                校验失败: {"code": -4, "message": "...", "data": {"path": "...", "expected": "Etag", "actual": "MD5"}}
                 失败: {"code": -1, "message": "...", "data": None}
         """
 
@@ -1596,35 +3383,246 @@ class Pan123Tool:
                 return make_result(CODE_CONFLICT, "文件已存在", {"path": full_path, "conflict": True})
             os.remove(full_path)
 
-        # TODO: 可以考虑断点续传
         # 使用临时文件下载
-        temp_path = full_path + ".123pan"
+        temp_path = full_path + DOWNLOAD_TEMP_SUFFIX
+        journal_path = full_path + DOWNLOAD_JOURNAL_SUFFIX
+        identity = self._journal_identity(item) if self.resume and item else None
+        expected = (item.get("Etag") or "").lower() if self.verify and item else ""
+        if not re.fullmatch(r"[0-9a-f]{32}", expected):
+            expected = ""
+        # 已知大小且不足两段的文件既不分段也不值得续传，省去一次 Range 探测请求
+        size = item.get("Size") if item else None
+        small = isinstance(size, int) and 0 <= size < 2 * self.min_segment_size
+        resumable = False
         try:
-            resp = requests.get(url, stream=True, timeout=TIMEOUT_DOWNLOAD)
-            total = int(resp.headers.get("Content-Length", 0))
-            downloaded = 0
-            start = time.time()
-            with open(temp_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if on_progress:
-                            elapsed = time.time() - start
-                            speed = downloaded / elapsed if elapsed > 0 else 0.0
-                            on_progress({
-                                "type": Pan123EventType.DOWNLOAD_PROGRESS,
-                                "downloaded": downloaded,
-                                "total": total,
-                                "speed": speed,
-                            })
+            total = self._probe_range(url) if not small and (identity or self.download_segments > 1) else -1
+            resumable = identity is not None and total > 0
+            segments = self._load_journal(journal_path, temp_path, identity, total) if resumable else None
+            if segments is None:
+                self._remove_partial(temp_path, journal_path)
+                segments = [[start, end, 0] for start, end in self._split_segments(total)]
+                if segments:
+                    with open(temp_path, "wb") as f:
+                        f.truncate(total)
+            if resumable or len(segments) > 1:
+                hasher = _PrefixMD5(temp_path, segments) if expected else None
+                self._download_segmented(
+                    url, temp_path, total, segments, on_progress,
+                    journal_path=journal_path if resumable else None,
+                    identity=identity,
+                    hasher=hasher,
+                )
+                actual = hasher.hexdigest() if hasher else ""
+            else:
+                actual = self._download_single(url, temp_path, on_progress, verify=bool(expected))
+            if actual != expected:
+                self._remove_partial(temp_path, journal_path)
+                return make_result(
+                    CODE_CHECKSUM_MISMATCH, f"校验失败: MD5 {actual} 与 Etag {expected} 不一致",
+                    {"path": full_path, "expected": expected, "actual": actual},
+                )
             os.rename(temp_path, full_path)
+            self._remove_partial(journal_path)
             return make_result(CODE_OK, "下载完成", {"path": full_path})
         except Exception as e:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            if not resumable:
+                self._remove_partial(temp_path, journal_path)
             return make_result(-1, f"下载失败: {e}")
 
+    def _probe_range(self, url: str) -> int:
+        """探测下载地址是否支持 Range 请求。
+
+        发送 "Range: bytes=0-0" 请求，服务端返回 206 且带有 Content-Range 时视为支持。
+
+        Returns:
+            文件总字节数；不支持 Range 或无法确定大小时返回 -1。
+        """
+        try:
+            resp = self.core.transfer_session.get(url, headers={"Range": "bytes=0-0"}, timeout=TIMEOUT_DOWNLOAD)
+        except requests.RequestException:
+            return -1
+        with resp:
+            if resp.status_code != 206 or resp.headers.get("Accept-Ranges", "bytes").lower() == "none":
+                return -1
+            match = re.match(r"bytes\s+\d+-\d+/(\d+)", resp.headers.get("Content-Range", ""))
+            return int(match.group(1)) if match else -1
+
+    def _split_segments(self, total: int) -> List[Tuple[int, int]]:
+        """将 [0, total) 切分为若干闭区间 (start, end)，每段不小于 min_segment_size。
+
+        Returns:
+            分段列表；total 未知时返回空列表，不足两段时返回单段。
+        """
+        if total <= 0:
+            return []
+        count = min(self.download_segments, total // self.min_segment_size)
+        if count <= 1:
+            return [(0, total - 1)]
+        size = -(-total // count)
+        return [(start, min(start + size, total) - 1) for start in range(0, total, size)]
+
+    # ── 断点续传记录 ─────────────────────────────────────────────
+
+    @staticmethod
+    def _journal_identity(item: Dict) -> Dict[str, Any]:
+        """提取与直链无关的文件标识，用于判断续传记录是否属于同一文件。"""
+        return {"FileId": item["FileId"], "Etag": item.get("Etag", ""), "Size": item.get("Size", 0)}
+
+    @staticmethod
+    def _load_journal(
+            journal_path: str,
+            temp_path: str,
+            identity: Dict[str, Any],
+            total: int,
+    ) -> Optional[List[List[int]]]:
+        """读取续传记录，校验文件标识、大小及临时文件后返回各段 [start, end, done]。
+
+        Returns:
+            可续传的分段列表；记录不存在、不匹配或已损坏时返回 None。
+        """
+        if not (os.path.exists(journal_path) and os.path.exists(temp_path)):
+            return None
+        try:
+            with open(journal_path, "r", encoding="utf-8") as f:
+                journal = json.load(f)
+            if any(journal.get(k) != v for k, v in identity.items()):
+                return None
+            if journal.get("Size") != total or os.path.getsize(temp_path) != total:
+                return None
+            segments = [[int(start), int(end), int(done)] for start, end, done in journal["segments"]]
+            if not all(0 <= done <= end - start + 1 for start, end, done in segments):
+                return None
+            return segments
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_journal(self, journal_path: str, identity: Dict[str, Any], segments: List[List[int]]) -> None:
+        """原子地写入续传记录（先写临时文件再替换）。"""
+        with self._journal_lock:
+            tmp = journal_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({**identity, "segments": segments}, f)
+            os.replace(tmp, journal_path)
+
+    @staticmethod
+    def _remove_partial(*paths: str) -> None:
+        """删除下载残留的临时文件 / 续传记录。"""
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    # ── 下载执行 ────────────────────────────────────────────────
+
+    def _download_single(self, url: str, temp_path: str, on_progress: ProgressCallback, verify: bool = False) -> str:
+        """单连接流式下载到临时文件。
+
+        Returns:
+            verify=True 时返回边写边计算的 MD5，否则返回空字符串。
+        """
+        md5 = hashlib.md5() if verify else None
+        with self.core.transfer_session.get(url, stream=True, timeout=TIMEOUT_DOWNLOAD) as resp:
+            progress = _TransferProgress(int(resp.headers.get("Content-Length", 0)), on_progress)
+            with open(temp_path, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if chunk:
+                        if self.rate_limiter:
+                            self.rate_limiter.consume(len(chunk))
+                        f.write(chunk)
+                        if md5:
+                            md5.update(chunk)
+                        progress.add(len(chunk))
+        return md5.hexdigest() if md5 else ""
+
+    def _download_segmented(
+            self,
+            url: str,
+            temp_path: str,
+            total: int,
+            segments: List[List[int]],
+            on_progress: ProgressCallback,
+            journal_path: Optional[str] = None,
+            identity: Optional[Dict[str, Any]] = None,
+            hasher: Optional[_PrefixMD5] = None,
+    ) -> None:
+        """多连接分段下载：各段从自身已完成位置继续，并发写入预分配临时文件的对应偏移。
+
+        segments 中每项为 [start, end, done]，done 在下载过程中原地更新；
+        提供 journal_path 时定期及结束时（无论成功失败）保存续传记录；
+        提供 hasher 时各段写入数据后推进增量 MD5。
+        任一段失败时通知其余段尽快停止，并将异常抛给调用方。
+        """
+        progress = _TransferProgress(total, on_progress, done=sum(seg[2] for seg in segments))
+        stop = threading.Event()
+        save = (lambda: self._save_journal(journal_path, identity, segments)) if journal_path else None
+
+        def worker(segment: List[int]) -> None:
+            try:
+                self._download_segment(url, temp_path, segment, progress, stop, save, hasher)
+            except Exception:
+                stop.set()
+                raise
+
+        pending = [seg for seg in segments if seg[2] < seg[1] - seg[0] + 1]
+        try:
+            if save:
+                save()
+            with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+                futures = [pool.submit(worker, seg) for seg in pending]
+                for future in futures:
+                    future.result()
+        finally:
+            if save:
+                save()
+
+    def _download_segment(
+            self,
+            url: str,
+            temp_path: str,
+            segment: List[int],
+            progress: _TransferProgress,
+            stop: threading.Event,
+            save_journal: Optional[Callable[[], None]] = None,
+            hasher: Optional[_PrefixMD5] = None,
+    ) -> None:
+        """从 segment = [start, end, done] 的 start + done 处继续下载，写入临时文件对应偏移。
+
+        先 flush 数据再更新续传记录，记录中的 done 不会超过已写入的字节数。
+        hasher 的补读同样只读取 done 以内（已 flush）的数据。
+        """
+        start, end, done = segment
+        headers = {"Range": f"bytes={start + done}-{end}"}
+        with self.core.transfer_session.get(url, headers=headers, stream=True, timeout=TIMEOUT_DOWNLOAD) as resp:
+            if resp.status_code != 206:
+                raise IOError(f"分段请求失败，HTTP {resp.status_code}")
+            with open(temp_path, "r+b") as f:
+                f.seek(start + done)
+                unsaved = 0
+                for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if stop.is_set():
+                        break
+                    if chunk:
+                        if self.rate_limiter:
+                            self.rate_limiter.consume(len(chunk))
+                        f.write(chunk)
+                        if hasher:
+                            hasher.feed(start + segment[2] + unsaved, chunk)
+                        unsaved += len(chunk)
+                        progress.add(len(chunk))
+                        if unsaved >= DOWNLOAD_JOURNAL_INTERVAL:
+                            f.flush()
+                            segment[2] += unsaved
+                            unsaved = 0
+                            if save_journal:
+                                save_journal()
+                            if hasher:
+                                hasher.advance()
+                f.flush()
+                segment[2] += unsaved
+        if hasher:
+            hasher.advance()
+        if not stop.is_set() and segment[2] != end - start + 1:
+            raise IOError(f"分段数据不完整: {start}-{end}，已接收 {segment[2]} 字节")
+
     def download_directory(
             self,
             directory: Dict,
@@ -1635,10 +3633,18 @@ class Pan123Tool:
     ) -> Dict[str, Any]:
         """递归下载整个目录到本地。
 
+        由三组线程协作完成:
+            1. 遍历线程按广度优先列出远程目录树，创建本地目录，将文件放入有界的待解析队列；
+            2. link_workers 个线程并发解析直链，放入有界的待下载队列；
+            3. download_workers 个线程并发下载，失败时重新获取直链重试（最多 download_retries 次）。
+        队列有界，遍历和直链解析不会领先下载太多，提前解析的直链不会过期。
+        所有下载共享 rate_limit 全局限速。
+
         Args:
             directory:     文件夹信息字典（需包含 "FileId"、"FileName"、"Type" 字段）。
             save_dir:      本地保存根目录路径。
-            on_progress:   下载进度回调函数（同 download_file）。
+            on_progress:   下载进度回调函数（同 download_file），在锁内串行调用；
+                           多文件并发下载时 DOWNLOAD_PROGRESS 事件附带 "file_name"。
             overwrite:     True = 覆盖已存在文件。
             skip_existing: True = 跳过已存在文件。
 
@@ -1653,38 +3659,730 @@ class Pan123Tool:
         target_dir = os.path.join(save_dir, directory["FileName"])
         os.makedirs(target_dir, exist_ok=True)
 
-        r = self.core.list_dir_all(parent_id=directory["FileId"])
-        if r["code"] != CODE_OK:
-            return r
+        errors: List[str] = []
+        lock = threading.Lock()
+        link_q: "queue.Queue[Optional[Tuple[Dict, str]]]" = queue.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+        ready_q: "queue.Queue[Optional[Tuple[Dict, str, str]]]" = queue.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+        first_listing: Dict[str, Any] = {}
+
+        def emit(event: Dict[str, Any]) -> None:
+            if on_progress:
+                with lock:
+                    on_progress(event)
+
+        def fail(item: Dict, message: str) -> None:
+            with lock:
+                errors.append(f"{item.get('FileName', item.get('FileId'))}: {message}")
+
+        def walker() -> None:
+            """广度优先遍历远程目录树。"""
+            dirs = deque([(directory, target_dir)])
+            try:
+                while dirs:
+                    folder, local_dir = dirs.popleft()
+                    for r in self.core.iter_dir(parent_id=folder["FileId"]):
+                        if folder is directory and not first_listing:
+                            first_listing.update(r)
+                        if r["code"] != CODE_OK:
+                            fail(folder, r["message"])
+                            break
+                        for item in r["data"]["items"]:
+                            if item["Type"] == 1:
+                                sub_dir = os.path.join(local_dir, item["FileName"])
+                                os.makedirs(sub_dir, exist_ok=True)
+                                emit({
+                                    "type": Pan123EventType.DOWNLOAD_START_DIRECTORY,
+                                    "file_name": item["FileName"],
+                                    "dir_name": item["FileName"],
+                                    "message": f"正在下载目录: {item['FileName']}",
+                                })
+                                dirs.append((item, sub_dir))
+                            else:
+                                link_q.put((item, local_dir))
+            except Exception as e:
+                fail(directory, f"遍历目录失败: {e}")
+            finally:
+                for _ in range(self.link_workers):
+                    link_q.put(None)
+
+        def resolver() -> None:
+            """并发解析直链。"""
+            while (task := link_q.get()) is not None:
+                item, local_dir = task
+                try:
+                    r = self.core.get_item_download_url(item)
+                except Exception as e:
+                    # 单个条目出错不能终止线程，否则队列无人消费，遍历线程会一直阻塞
+                    fail(item, f"获取下载链接失败: {e}")
+                    continue
+                # 解析失败时留空，由下载线程按重试逻辑重新获取
+                ready_q.put((item, local_dir, r["data"]["url"] if r["code"] == CODE_OK else ""))
+
+        def downloader() -> None:
+            """并发下载文件。"""
+            while (task := ready_q.get()) is not None:
+                item, local_dir, url = task
+                try:
+                    emit({
+                        "type": Pan123EventType.DOWNLOAD_START_FILE,
+                        "file_name": item["FileName"],
+                        "file_size": item["Size"],
+                        "message": f"正在下载文件: {item['FileName']}",
+                    })
+                    file_progress = (lambda e, name=item["FileName"]: emit({**e, "file_name": name})) \
+                        if on_progress else None
+                    r = self._download_with_retry(item, local_dir, file_progress, overwrite, skip_existing, url=url)
+                except Exception as e:
+                    r = make_result(-1, f"下载失败: {e}")
+                if r["code"] != CODE_OK:
+                    fail(item, r["message"])
+
+        walk_thread = threading.Thread(target=walker, daemon=True)
+        link_threads = [threading.Thread(target=resolver, daemon=True) for _ in range(self.link_workers)]
+        download_threads = [threading.Thread(target=downloader, daemon=True) for _ in range(self.download_workers)]
+        for t in [walk_thread, *link_threads, *download_threads]:
+            t.start()
+        walk_thread.join()
+        for t in link_threads:
+            t.join()
+        for _ in download_threads:
+            ready_q.put(None)
+        for t in download_threads:
+            t.join()
+
+        # 顶层目录列出失败时返回原始错误
+        if first_listing.get("code", CODE_OK) != CODE_OK:
+            return first_listing
+        if errors:
+            return make_result(-1, f"部分文件下载失败: {'; '.join(errors)}", {"path": target_dir})
+        return make_result(CODE_OK, "文件夹下载完成", {"path": target_dir})
 
-        items = r["data"]["items"]
-        if not items:
-            return make_result(CODE_OK, "文件夹为空", {"path": target_dir})
+    def export_links(
+            self,
+            item: Dict,
+            out_file: str = "",
+            fmt: str = "aria2",
+            save_dir: str = "download",
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """解析文件或整个文件夹树的直链，写出供外部下载器使用的清单，本身不下载任何数据。
+
+        广度优先遍历远程目录，直链由 link_workers 个线程并发解析（在途数量有界），
+        解析完成即写入清单。清单中的本地路径与 download_directory() 的目录结构一致::
+
+            aria2: <直链>\n  dir=<本地目录>\n  out=<文件名>\n  checksum=md5=<Etag>
+                   使用: aria2c -i <清单> -x 8 -j 8
+            curl:  url = "<直链>"\n  output = "<本地路径>"
+                   使用: curl -K <清单> --parallel
+
+        直链有时效（通常数小时），清单生成后应尽快交给下载器。
+
+        Args:
+            item:        文件或文件夹信息字典。
+            out_file:    清单输出路径，为空则为 "<文件名>.<fmt>"。
+            fmt:         清单格式，见 EXPORT_FORMATS。
+            save_dir:    清单中的本地保存根目录。
+            on_progress: 进度回调，每解析完一个直链触发一次 EXPORT_PROGRESS 事件::
+
+                             {"type": "export_progress", "done": int, "failed": int}
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "已导出 n 个直链", "data": {"path": str, "files": int, "errors": []}}
+                部分失败: {"code": -1, "message": "部分直链解析失败: ...", "data": {同上}}
+                失败: {"code": <错误码>, "message": "...", "data": None}
+        """
+        if fmt not in EXPORT_FORMATS:
+            return make_result(-1, f"不支持的格式: {fmt}，可选 {' / '.join(EXPORT_FORMATS)}")
+        out_file = out_file or f"{item['FileName']}.{fmt}"
+        write_entry = self._aria2_entry if fmt == "aria2" else self._curl_entry
+        if item["Type"] == 1:
+            # 顶层目录列出失败时直接返回原始错误（第一页随后由 listing_cache 复用）
+            first = self.core.list_dir(item["FileId"])
+            if first["code"] != CODE_OK:
+                return first
+
+        def walk() -> Iterator[Tuple[Dict, str]]:
+            if item["Type"] != 1:
+                yield item, save_dir
+                return
+            dirs = deque([(item, os.path.join(save_dir, item["FileName"]))])
+            while dirs:
+                folder, local_dir = dirs.popleft()
+                for r in self.core.iter_dir(parent_id=folder["FileId"]):
+                    if r["code"] != CODE_OK:
+                        errors.append(f"{folder['FileName']}: {r['message']}")
+                        break
+                    for child in r["data"]["items"]:
+                        if child["Type"] == 1:
+                            dirs.append((child, os.path.join(local_dir, child["FileName"])))
+                        else:
+                            yield child, local_dir
 
         errors: List[str] = []
-        for item in items:
-            if item["Type"] == 1:
-                # 递归下载子目录
+        done = 0
+        in_flight: Dict[Future, Tuple[Dict, str]] = {}
+        try:
+            with open(out_file, "w", encoding="utf-8") as f, \
+                    ThreadPoolExecutor(max_workers=self.link_workers) as pool:
+                if fmt == "curl":
+                    f.write("create-dirs\n")
+
+                def drain(return_when: str) -> None:
+                    nonlocal done
+                    finished, _ = wait(in_flight, return_when=return_when)
+                    for future in finished:
+                        file_item, local_dir = in_flight.pop(future)
+                        r = future.result()
+                        if r["code"] == CODE_OK:
+                            f.write(write_entry(r["data"]["url"], local_dir, file_item))
+                            done += 1
+                        else:
+                            errors.append(f"{file_item['FileName']}: {r['message']}")
+                        if on_progress:
+                            on_progress({"type": Pan123EventType.EXPORT_PROGRESS, "done": done, "failed": len(errors)})
+
+                for file_item, local_dir in walk():
+                    in_flight[pool.submit(self.core.get_item_download_url, file_item)] = (file_item, local_dir)
+                    if len(in_flight) >= DOWNLOAD_QUEUE_SIZE:
+                        drain(FIRST_COMPLETED)
+                if in_flight:
+                    drain(ALL_COMPLETED)
+        except OSError as e:
+            return make_result(-1, f"写入清单失败: {e}")
+
+        data = {"path": out_file, "files": done, "errors": errors}
+        if errors:
+            return make_result(-1, f"部分直链解析失败: {'; '.join(errors)}", data)
+        return make_result(CODE_OK, f"已导出 {done} 个直链", data)
+
+    @staticmethod
+    def _aria2_entry(url: str, local_dir: str, item: Dict) -> str:
+        entry = f"{url}\n  dir={local_dir}\n  out={item['FileName']}\n"
+        etag = (item.get("Etag") or "").lower()
+        if re.fullmatch(r"[0-9a-f]{32}", etag):
+            entry += f"  checksum=md5={etag}\n"
+        return entry
+
+    @staticmethod
+    def _curl_entry(url: str, local_dir: str, item: Dict) -> str:
+        def quote(value: str) -> str:
+            return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+        return f"url = {quote(url)}\noutput = {quote(os.path.join(local_dir, item['FileName']))}\n"
+
+    def upload_file(
+            self,
+            file_path: str,
+            duplicate: int = 0,
+            on_progress: ProgressCallback = None,
+    ) -> Dict[str, Any]:
+        """上传本地文件或文件夹到当前目录。
+
+        文件直接调用 Pan123Core.upload_file()，文件夹调用 upload_directory()。
+
+        Args:
+            file_path:   本地文件或文件夹路径。
+            duplicate:   同名文件处理策略（同 Pan123Core.upload_file）。
+            on_progress: 进度回调，文件为 UPLOAD_PROGRESS 事件，文件夹为 UPLOAD_DIRECTORY_PROGRESS 事件。
+
+        Returns:
+            Result 字典:: 来自 Pan123Core.upload_file() 或 upload_directory() 的结果。
+        """
+        file_path = file_path.strip().replace('"', "").replace("\\", "/")
+        if os.path.isdir(file_path):
+            return self.upload_directory(file_path, duplicate=duplicate, on_progress=on_progress)
+        return self.core.upload_file(file_path, duplicate, on_progress)
+
+    def upload_directory(
+            self,
+            local_dir: str,
+            parent_id: Optional[int] = None,
+            duplicate: int = 0,
+            on_progress: ProgressCallback = None,
+            hash_workers: int = UPLOAD_HASH_WORKERS,
+            upload_workers: int = UPLOAD_FILE_WORKERS,
+    ) -> Dict[str, Any]:
+        """将本地文件夹按原有结构上传到指定目录。
+
+        流程: 遍历本地目录树并按层级创建远程目录（父目录 ID 缓存在内存中，不改变 cwd_id）→
+              MD5 缓存未命中的文件交给进程池计算 MD5 →
+              每算完一个文件即交给线程池执行秒传检查 / 分块上传。
+
+        Args:
+            local_dir:      本地文件夹路径。
+            parent_id:      远程父目录 FileId，为 None 则使用当前工作目录 cwd_id。
+            duplicate:      同名文件处理策略（同 Pan123Core.upload_file）。
+            on_progress:    进度回调，每完成一个文件触发一次 UPLOAD_DIRECTORY_PROGRESS 事件::
+
+                                {"type": ..., "files_done": int, "files_total": int,
+                                 "uploaded": int, "total": int, "speed": float, "files_per_sec": float}
+            hash_workers:   计算 MD5 的进程数。
+            upload_workers: 同时上传的文件数，每个大文件另有 core.upload_concurrency 个分块并发。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "文件夹上传完成", "data": {统计信息}}
+                部分失败: {"code": -1, "message": "部分文件上传失败: ...", "data": {统计信息}}
+                失败: {"code": -1, "message": "...", "data": None}
+
+            统计信息: {"files": int, "reused": int, "bytes": int, "elapsed": float,
+                       "speed": float, "files_per_sec": float, "errors": [str, ...]}
+        """
+        local_dir = os.path.normpath(local_dir)
+        if not os.path.isdir(local_dir):
+            return make_result(-1, "文件夹不存在")
+        if parent_id is None:
+            parent_id = self.core.cwd_id
+
+        # 步骤 1: 按层级创建远程目录，收集待上传文件
+        remote_ids: Dict[str, int] = {}
+        files: List[Tuple[str, int, os.stat_result]] = []
+        for root, dirs, names in os.walk(local_dir):
+            rel = os.path.relpath(root, local_dir)
+            if rel == ".":
+                parent, name = parent_id, os.path.basename(local_dir)
+            else:
+                parent, name = remote_ids[os.path.dirname(rel) or "."], os.path.basename(rel)
+            r = self._make_remote_dir(name, parent)
+            if r["code"] != CODE_OK:
+                # 创建失败的目录不再向下遍历
+                dirs.clear()
+                if rel == ".":
+                    return r
+                continue
+            remote_ids[rel] = r["data"]
+            for file_name in names:
+                path = os.path.join(root, file_name)
+                try:
+                    files.append((path, remote_ids[rel], os.stat(path)))
+                except OSError:
+                    continue
+
+        # 步骤 2 / 3: MD5 计算与上传流水线
+        total_bytes = sum(st.st_size for _, _, st in files)
+        stats = {"files": 0, "reused": 0, "bytes": 0, "errors": []}
+        lock = threading.Lock()
+        start = time.time()
+
+        def finish(path: str, size: int, r: Dict[str, Any]) -> None:
+            with lock:
+                stats["files"] += 1
+                if r["code"] == CODE_OK:
+                    stats["bytes"] += size
+                    stats["reused"] += bool(r.get("data") and r["data"].get("reuse"))
+                else:
+                    stats["errors"].append(f"{os.path.relpath(path, local_dir)}: {r['message']}")
                 if on_progress:
+                    elapsed = time.time() - start
                     on_progress({
-                        "type": Pan123EventType.DOWNLOAD_START_DIRECTORY,
-                        "file_name": item["FileName"],
-                        "dir_name": item["FileName"],
-                        "message": f"正在下载目录: {item['FileName']}",
+                        "type": Pan123EventType.UPLOAD_DIRECTORY_PROGRESS,
+                        "files_done": stats["files"],
+                        "files_total": len(files),
+                        "uploaded": stats["bytes"],
+                        "total": total_bytes,
+                        "speed": stats["bytes"] / elapsed if elapsed > 0 else 0.0,
+                        "files_per_sec": stats["files"] / elapsed if elapsed > 0 else 0.0,
                     })
-                sub = self.download_directory(item, target_dir, on_progress, overwrite, skip_existing)
+
+        def upload(path: str, parent: int, st: os.stat_result, md5: str) -> None:
+            try:
+                r = self.core.upload_file(path, duplicate, parent_id=parent, md5=md5)
+            except Exception as e:
+                r = make_result(-1, f"上传失败: {e}")
+            finish(path, st.st_size, r)
+
+        cache = self.core.hash_cache
+        with ThreadPoolExecutor(max_workers=max(1, upload_workers)) as uploader:
+            submitted: List[Future] = []
+            misses: List[Tuple[str, int, os.stat_result]] = []
+            for path, parent, st in files:
+                md5 = cache.get(st) if cache else None
+                if md5:
+                    submitted.append(uploader.submit(upload, path, parent, st, md5))
+                else:
+                    misses.append((path, parent, st))
+            # 全部命中 MD5 缓存时无需启动进程池
+            if misses:
+                with ProcessPoolExecutor(max_workers=max(1, min(hash_workers, len(misses)))) as hasher:
+                    pending = {hasher.submit(calc_file_md5, path): (path, parent, st)
+                               for path, parent, st in misses}
+                    for future in as_completed(pending):
+                        path, parent, st = pending[future]
+                        try:
+                            md5 = future.result()
+                        except Exception as e:
+                            finish(path, st.st_size, make_result(-1, f"读取文件失败: {e}"))
+                            continue
+                        # 计算期间文件被修改则不缓存，也不以过期的 MD5 上传
+                        try:
+                            changed = os.stat(path).st_mtime_ns != st.st_mtime_ns
+                        except OSError as e:
+                            finish(path, st.st_size, make_result(-1, f"读取文件失败: {e}"))
+                            continue
+                        if changed:
+                            finish(path, st.st_size, make_result(-1, "文件在计算 MD5 期间被修改"))
+                            continue
+                        if cache:
+                            cache.put(st, md5)
+                        submitted.append(uploader.submit(upload, path, parent, st, md5))
+            for future in submitted:
+                # upload 内部已捕获异常，这里仅用于暴露 finish 自身的错误
+                future.result()
+
+        elapsed = time.time() - start
+        stats["elapsed"] = elapsed
+        stats["speed"] = stats["bytes"] / elapsed if elapsed > 0 else 0.0
+        stats["files_per_sec"] = stats["files"] / elapsed if elapsed > 0 else 0.0
+        if stats["errors"]:
+            return make_result(-1, f"部分文件上传失败: {'; '.join(stats['errors'])}", stats)
+        return make_result(CODE_OK, "文件夹上传完成", stats)
+
+    def _make_remote_dir(self, name: str, parent_id: int) -> Dict[str, Any]:
+        """在 parent_id 下创建目录并返回其 FileId。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "ok", "data": FileId}
+                失败: {"code": <错误码>, "message": "...", "data": ...}
+        """
+        r = self.core.mkdir(name, parent_id=parent_id)
+        if r["code"] != CODE_OK:
+            return make_result(r["code"], f"创建目录 {name} 失败: {r['message']}", r.get("data"))
+        info = r["data"].get("data") or {}
+        file_id = info.get("FileId") or (info.get("Info") or {}).get("FileId")
+        if not file_id:
+            return make_result(-1, f"创建目录 {name} 失败: 响应中缺少 FileId", r["data"])
+        return make_result(CODE_OK, "ok", file_id)
+
+    # ── 目录同步 ────────────────────────────────────────────────
+
+    def plan_sync(
+            self,
+            local_dir: str,
+            remote_id: Optional[int] = None,
+            direction: str = "both",
+            hash_workers: int = UPLOAD_HASH_WORKERS,
+    ) -> Dict[str, Any]:
+        """比较本地目录与远程目录，生成同步计划（不执行任何传输）。
+
+        本地文件以 大小 + MD5（优先取 HashCache）标识，远程文件以 Size + Etag 标识：
+        大小不同直接视为已变化，大小相同再比较 MD5，一致则跳过。只在一侧存在的文件按 direction 上传或下载；
+        两侧内容不同时 "up" / "down" 以对应一侧为准，"both" 以修改时间较新的一侧为准
+        （UpdateAt 无法解析或时间相同时记为冲突，不做处理）。不会删除任何一侧的文件。
+        待上传文件的 MD5 也在此阶段由进程池计算，执行时直接用于秒传检查。
+
+        Args:
+            local_dir:    本地目录路径，direction 不为 "up" 时可以不存在（执行时创建）。
+            remote_id:    远程目录 FileId，为 None 则使用当前工作目录 cwd_id。
+            direction:    同步方向，见 SYNC_DIRECTIONS。
+            hash_workers: 计算 MD5 的进程数。
+
+        Returns:
+            Result 字典::
+
+                成功: {
+                    "code": 0,
+                    "message": "...",
+                    "data": {
+                        "local_dir": str, "remote_id": int, "direction": str,
+                        "remote_dirs": {相对路径: FileId, ...},
+                        "actions": [动作 dict, ...],
+                        "summary": {动作名: 数量, ...}
+                    }
+                }
+                失败: {"code": <错误码>, "message": "...", "data": None}
+
+            动作 dict: {"action": "upload" | "download" | "mkdir_remote" | "mkdir_local" | "skip" | "conflict",
+                        "path": 相对路径（"/" 分隔）, "local": 本地路径, "size": int, "reason": str,
+                        "item": 远程文件信息 dict 或 None, "md5": 本地文件 MD5 或 ""}
+        """
+        if direction not in SYNC_DIRECTIONS:
+            return make_result(-1, f"不支持的同步方向: {direction}")
+        local_dir = os.path.normpath(local_dir)
+        if os.path.exists(local_dir) and not os.path.isdir(local_dir):
+            return make_result(-1, "本地路径不是文件夹")
+        if direction == "up" and not os.path.isdir(local_dir):
+            return make_result(-1, "文件夹不存在")
+        if remote_id is None:
+            remote_id = self.core.cwd_id
+        upload, download = direction != "down", direction != "up"
+
+        # 远程目录树（忽略列表缓存，以服务端当前状态为准）
+        remote: Dict[str, Dict] = {}
+        remote_dirs: Dict[str, int] = {"": remote_id}
+        dirs = deque([("", remote_id)])
+        while dirs:
+            rel, folder_id = dirs.popleft()
+            r = self.core.list_dir_all(folder_id, use_cache=False)
+            if r["code"] != CODE_OK:
+                return r
+            for item in r["data"]["items"]:
+                path = f"{rel}/{item['FileName']}" if rel else item["FileName"]
+                remote[path] = item
+                if item["Type"] == 1:
+                    remote_dirs[path] = item["FileId"]
+                    dirs.append((path, item["FileId"]))
+
+        # 本地目录树，None 表示目录；跳过未完成下载的临时文件
+        local: Dict[str, Optional[os.stat_result]] = {}
+        for root, dir_names, names in os.walk(local_dir):
+            rel = os.path.relpath(root, local_dir).replace(os.sep, "/")
+            prefix = "" if rel == "." else rel + "/"
+            for name in dir_names:
+                local[prefix + name] = None
+            for name in names:
+                if name.endswith((DOWNLOAD_TEMP_SUFFIX, DOWNLOAD_JOURNAL_SUFFIX)):
+                    continue
+                try:
+                    local[prefix + name] = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+
+        def etag_of(item: Dict) -> str:
+            etag = (item.get("Etag") or "").lower()
+            return etag if re.fullmatch(r"[0-9a-f]{32}", etag) else ""
+
+        # 只为大小相同、需比较内容的文件及待上传的新文件计算 MD5
+        to_hash = {
+            path: st for path, st in local.items()
+            if st is not None and (
+                (path in remote and remote[path]["Type"] != 1
+                 and st.st_size == remote[path]["Size"] and etag_of(remote[path]))
+                or (path not in remote and upload)
+            )
+        }
+        md5s, hash_errors = self._hash_local_files(local_dir, to_hash, hash_workers)
+
+        actions: List[Dict[str, Any]] = []
+
+        def add(action: str, path: str, reason: str, size: int = 0, item: Optional[Dict] = None) -> None:
+            actions.append({
+                "action": action,
+                "path": path,
+                "local": os.path.join(local_dir, *path.split("/")),
+                "size": size,
+                "reason": reason,
+                "item": item,
+                "md5": md5s.get(path, ""),
+            })
+
+        for path in sorted(set(local) | set(remote)):
+            st, item = local.get(path), remote.get(path)
+            if path in hash_errors:
+                add("conflict", path, hash_errors[path], st.st_size, item)
+            elif path not in remote:
+                if upload:
+                    if st is None:
+                        add("mkdir_remote", path, "远程不存在")
+                    else:
+                        add("upload", path, "远程不存在", st.st_size)
+            elif path not in local:
+                if download:
+                    if item["Type"] == 1:
+                        add("mkdir_local", path, "本地不存在", item=item)
+                    else:
+                        add("download", path, "本地不存在", item["Size"], item)
+            elif (st is None) != (item["Type"] == 1):
+                add("conflict", path, "本地与远程类型不同", item=item)
+            elif st is None:
+                continue
+            elif st.st_size == item["Size"] and (not etag_of(item) or md5s.get(path) == etag_of(item)):
+                add("skip", path, "内容相同", st.st_size, item)
+            elif direction == "up":
+                add("upload", path, "内容不同", st.st_size, item)
+            elif direction == "down":
+                add("download", path, "内容不同", item["Size"], item)
             else:
+                remote_time = _parse_update_time(item.get("UpdateAt"))
+                if remote_time is None or int(st.st_mtime) == int(remote_time):
+                    add("conflict", path, "内容不同且无法比较修改时间", st.st_size, item)
+                elif st.st_mtime > remote_time:
+                    add("upload", path, "本地较新", st.st_size, item)
+                else:
+                    add("download", path, "远程较新", item["Size"], item)
+
+        summary: Dict[str, int] = {}
+        for action in actions:
+            summary[action["action"]] = summary.get(action["action"], 0) + 1
+        data = {
+            "local_dir": local_dir,
+            "remote_id": remote_id,
+            "direction": direction,
+            "remote_dirs": remote_dirs,
+            "actions": actions,
+            "summary": summary,
+        }
+        labels = {"upload": "上传", "download": "下载", "mkdir_remote": "创建远程目录",
+                  "mkdir_local": "创建本地目录", "skip": "跳过", "conflict": "冲突"}
+        message = "，".join(f"{labels[name]} {count}" for name, count in summary.items()) or "两侧均为空"
+        return make_result(CODE_OK, message, data)
+
+    def sync(
+            self,
+            local_dir: str,
+            remote_id: Optional[int] = None,
+            direction: str = "both",
+            on_progress: ProgressCallback = None,
+            workers: int = UPLOAD_FILE_WORKERS,
+            plan: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """按 plan_sync() 生成的计划同步本地目录与远程目录。
+
+        先按层级创建缺失的目录，再由 workers 个线程并发执行上传 / 下载：
+        上传使用计划阶段算好的 MD5（服务端已有相同内容时直接秒传），同名文件覆盖；
+        下载失败时重新获取直链重试，同名文件覆盖。跳过和冲突的条目不产生任何传输。
+
+        Args:
+            local_dir:   本地目录路径。
+            remote_id:   远程目录 FileId，为 None 则使用当前工作目录 cwd_id。
+            direction:   同步方向，见 SYNC_DIRECTIONS。
+            on_progress: 进度回调，每完成一个传输触发一次 SYNC_PROGRESS 事件::
+
+                             {"type": ..., "action": str, "path": str, "done": int, "total": int,
+                              "bytes": int, "total_bytes": int}
+            workers:     同时传输的文件数。
+            plan:        已生成的计划（plan_sync() 返回的 data），提供时不再重新比较。
+
+        Returns:
+            Result 字典::
+
+                成功: {"code": 0, "message": "同步完成", "data": {统计信息}}
+                部分失败: {"code": -1, "message": "部分文件同步失败: ...", "data": {统计信息}}
+                失败: {"code": <错误码>, "message": "...", "data": None}
+
+            统计信息: {"uploaded": int, "reused": int, "downloaded": int, "skipped": int,
+                       "conflicts": int, "bytes": int, "elapsed": float, "errors": [str, ...]}
+        """
+        if plan is None:
+            r = self.plan_sync(local_dir, remote_id, direction)
+            if r["code"] != CODE_OK:
+                return r
+            plan = r["data"]
+        actions = plan["actions"]
+        remote_dirs = dict(plan["remote_dirs"])
+        stats = {
+            "uploaded": 0, "reused": 0, "downloaded": 0,
+            "skipped": sum(a["action"] == "skip" for a in actions),
+            "conflicts": sum(a["action"] == "conflict" for a in actions),
+            "bytes": 0, "errors": [],
+        }
+        lock = threading.Lock()
+        start = time.time()
+
+        def parent_of(path: str) -> str:
+            return path.rpartition("/")[0]
+
+        # 按层级创建目录，父目录创建失败时子项随之失败
+        for action in sorted(actions, key=lambda a: a["path"].count("/")):
+            if action["action"] == "mkdir_local":
+                os.makedirs(action["local"], exist_ok=True)
+            elif action["action"] == "mkdir_remote":
+                parent = remote_dirs.get(parent_of(action["path"]))
+                if parent is None:
+                    stats["errors"].append(f"{action['path']}: 父目录创建失败")
+                    continue
+                r = self._make_remote_dir(action["path"].rpartition("/")[2], parent)
+                if r["code"] != CODE_OK:
+                    stats["errors"].append(f"{action['path']}: {r['message']}")
+                    continue
+                remote_dirs[action["path"]] = r["data"]
+
+        transfers = [a for a in actions if a["action"] in ("upload", "download")]
+        total_bytes = sum(a["size"] for a in transfers)
+        done = [0]
+
+        def finish(action: Dict[str, Any], r: Dict[str, Any]) -> None:
+            with lock:
+                done[0] += 1
+                if r["code"] == CODE_OK:
+                    stats["bytes"] += action["size"]
+                    if action["action"] == "upload":
+                        stats["uploaded"] += 1
+                        stats["reused"] += bool(r.get("data") and r["data"].get("reuse"))
+                    else:
+                        stats["downloaded"] += 1
+                else:
+                    stats["errors"].append(f"{action['path']}: {r['message']}")
                 if on_progress:
                     on_progress({
-                        "type": Pan123EventType.DOWNLOAD_START_FILE,
-                        "file_name": item["FileName"],
-                        "file_size": item["Size"],
-                        "message": f"正在下载文件: {item['FileName']}",
+                        "type": Pan123EventType.SYNC_PROGRESS,
+                        "action": action["action"],
+                        "path": action["path"],
+                        "done": done[0],
+                        "total": len(transfers),
+                        "bytes": stats["bytes"],
+                        "total_bytes": total_bytes,
                     })
-                sub = self.download_item(item, target_dir, on_progress, overwrite, skip_existing)
-            if sub["code"] != CODE_OK:
-                errors.append(f"{item['FileName']}: {sub['message']}")
 
-        if errors:
-            return make_result(-1, f"部分文件下载失败: {'; '.join(errors)}", {"path": target_dir})
-        return make_result(CODE_OK, "文件夹下载完成", {"path": target_dir})
+        def run(action: Dict[str, Any]) -> None:
+            try:
+                if action["action"] == "upload":
+                    parent = remote_dirs.get(parent_of(action["path"]))
+                    if parent is None:
+                        r = make_result(-1, "父目录创建失败")
+                    else:
+                        r = self.core.upload_file(action["local"], 1, parent_id=parent, md5=action["md5"])
+                else:
+                    item = action["item"]
+                    save_dir = os.path.dirname(action["local"])
+                    os.makedirs(save_dir, exist_ok=True)
+                    r = self._download_with_retry(item, save_dir, None, overwrite=True, skip_existing=False)
+                    # 已通过 Etag 校验的文件直接记入 MD5 缓存，下次比较无需重新计算
+                    etag = (item.get("Etag") or "").lower()
+                    if r["code"] == CODE_OK and self.verify and self.core.hash_cache \
+                            and re.fullmatch(r"[0-9a-f]{32}", etag):
+                        self.core.hash_cache.put(os.stat(action["local"]), etag)
+            except Exception as e:
+                r = make_result(-1, f"同步失败: {e}")
+            finish(action, r)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(run, transfers))
+
+        stats["elapsed"] = time.time() - start
+        if stats["errors"]:
+            return make_result(-1, f"部分文件同步失败: {'; '.join(stats['errors'])}", stats)
+        return make_result(CODE_OK, "同步完成", stats)
+
+    def _hash_local_files(
+            self,
+            local_dir: str,
+            files: Dict[str, os.stat_result],
+            hash_workers: int,
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """计算 {相对路径: stat} 中文件的 MD5，优先使用 HashCache，未命中的交给进程池。
+
+        Returns:
+            ({相对路径: MD5}, {相对路径: 错误信息})
+        """
+        cache = self.core.hash_cache
+        md5s: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        misses: List[str] = []
+        for path, st in files.items():
+            md5 = cache.get(st) if cache else None
+            if md5:
+                md5s[path] = md5
+            else:
+                misses.append(path)
+        if not misses:
+            return md5s, errors
+        with ProcessPoolExecutor(max_workers=max(1, hash_workers)) as hasher:
+            pending = {
+                hasher.submit(calc_file_md5, os.path.join(local_dir, *path.split("/"))): path
+                for path in misses
+            }
+            for future in as_completed(pending):
+                path = pending[future]
+                try:
+                    md5s[path] = future.result()
+                except Exception as e:
+                    errors[path] = f"读取文件失败: {e}"
+                    continue
+                if cache:
+                    cache.put(files[path], md5s[path])
+        return md5s, errors
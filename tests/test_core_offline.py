@@ -0,0 +1,134 @@
+"""不访问网络的纯逻辑单元测试：限速器、上传会话记录、直链缓存、分段 MD5、CLI 编号解析。"""
+
+import hashlib
+import json
+import time
+
+from pan123_cli import Pan123CLI
+from pan123_core import LINK_CACHE_MARGIN, AdaptiveRateLimiter, LinkCache, UploadJournal, _PrefixMD5
+
+
+# ── AdaptiveRateLimiter ─────────────────────────────────────
+
+def test_rate_limiter_decreases_once_per_cooldown_window():
+    limiter = AdaptiveRateLimiter({"/a": 8.0}, decrease=0.5, cooldown=0.2)
+    for _ in range(5):
+        limiter.on_throttle("/a")
+    assert limiter.rate("/a") == 4.0
+    time.sleep(0.25)
+    limiter.on_throttle("/a")
+    assert limiter.rate("/a") == 2.0
+
+
+def test_rate_limiter_windows_are_per_endpoint():
+    limiter = AdaptiveRateLimiter({"/a": 8.0, "/b": 8.0}, decrease=0.5, cooldown=10)
+    limiter.on_throttle("/a")
+    limiter.on_throttle("/b")
+    assert limiter.rate("/a") == limiter.rate("/b") == 4.0
+
+
+def test_rate_limiter_recovers_up_to_budget():
+    limiter = AdaptiveRateLimiter({"/a": 1.0}, min_rate=0.2, increase=0.5, decrease=0.5, cooldown=0.01)
+    limiter.on_throttle("/a")
+    assert limiter.rate("/a") == 0.5
+    for _ in range(5):
+        limiter.on_success("/a")
+    assert limiter.rate("/a") == 1.0
+
+
+# ── UploadJournal ───────────────────────────────────────────
+
+def test_upload_journal_replays_part_log(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    journal = UploadJournal(path)
+    journal.put("k", {"UploadId": "u"})
+    for part in (1, 2, 3):
+        journal.mark_part("k", part)
+    journal.close()
+
+    # 分块确认只追加到日志，记录文件本身不被重写
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["k"]["parts"] == []
+    assert sorted(UploadJournal(path).get("k")["parts"]) == [1, 2, 3]
+
+
+def test_upload_journal_ignores_truncated_and_duplicate_lines(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    journal = UploadJournal(path)
+    journal.put("k", {})
+    journal.mark_part("k", 1)
+    journal.close()
+    with open(path + ".parts", "a", encoding="utf-8") as f:
+        f.write(json.dumps(["k", 1, 0]) + "\n")
+        f.write(json.dumps(["gone", 2, 0]) + "\n")
+        f.write('["k", 3')
+    assert UploadJournal(path).get("k")["parts"] == [1]
+
+
+def test_upload_journal_rewrite_folds_log(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    journal = UploadJournal(path)
+    journal.put("k", {})
+    journal.mark_part("k", 1)
+    journal.put("other", {})
+    assert not (tmp_path / "sessions.json.parts").exists()
+    journal.remove("other")
+    assert UploadJournal(path).get("k")["parts"] == [1]
+
+
+# ── LinkCache ───────────────────────────────────────────────
+
+def test_link_cache_url_expiry_formats():
+    assert LinkCache.url_expiry("https://cdn/x?auth_key=1700000000-abc-0-sig") == 1700000000
+    assert LinkCache.url_expiry("https://cdn/x?Expires=1700000001") == 1700000001
+    assert LinkCache.url_expiry("https://cdn/x?e=1700000002") == 1700000002
+    assert LinkCache.url_expiry(
+        "https://s3/x?X-Amz-Date=20231114T221320Z&X-Amz-Expires=600"
+    ) == 1700000000 + 600
+    assert LinkCache.url_expiry("https://s3/x?X-Amz-Date=bad&X-Amz-Expires=600") is None
+    assert LinkCache.url_expiry("https://cdn/x") is None
+
+
+def test_link_cache_respects_expiry_margin():
+    cache = LinkCache(default_ttl=60)
+    item = {"FileId": 1, "Etag": "e"}
+    cache.put(item, f"https://cdn/x?e={int(time.time()) + LINK_CACHE_MARGIN // 2}")
+    assert cache.get(item) is None
+    url = f"https://cdn/x?e={int(time.time()) + LINK_CACHE_MARGIN + 60}"
+    cache.put(item, url)
+    assert cache.get(item) == url
+    assert cache.get({"FileId": 1, "Etag": "other"}) is None
+
+
+# ── _PrefixMD5 ──────────────────────────────────────────────
+
+def test_prefix_md5_matches_whole_file_with_out_of_order_segments(tmp_path):
+    data = bytes(range(256)) * 1000
+    temp = tmp_path / "part.bin"
+    temp.write_bytes(data)
+    third = len(data) // 3
+    segments = [[0, third - 1, 0], [third, 2 * third - 1, 0], [2 * third, len(data) - 1, 0]]
+    hasher = _PrefixMD5(str(temp), segments)
+
+    # 第二段先完成：数据不接续 pos，只能等待补读
+    segments[1][2] = third
+    hasher.feed(third, data[third:2 * third])
+    assert hasher.pos == 0
+    # 第一段按顺序写入后，advance 接着补读已完成的第二段
+    hasher.feed(0, data[:third])
+    segments[0][2] = third
+    hasher.advance()
+    assert hasher.pos == 2 * third
+    segments[2][2] = len(data) - 2 * third
+    assert hasher.hexdigest() == hashlib.md5(data).hexdigest()
+
+
+# ── Pan123CLI._parse_indices ────────────────────────────────
+
+def test_parse_indices():
+    assert Pan123CLI._parse_indices("1 3 5-8") == [0, 2, 4, 5, 6, 7]
+    assert Pan123CLI._parse_indices("3-1,2") == [0, 1, 2]
+    assert Pan123CLI._parse_indices("0") == []
+    assert Pan123CLI._parse_indices("0-3") == []
+    assert Pan123CLI._parse_indices("1 x") == []
+    assert Pan123CLI._parse_indices("") == []